@@ -2,7 +2,10 @@ import os, sys
 from os.path import join, dirname
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
+import jwt
+import hashlib
+import secrets
+import uuid
 import models
 
 dotenv_path = join(dirname(__file__), '.env')
@@ -11,6 +14,7 @@ load_dotenv(dotenv_path)
 SECRET_KEY = os.environ.get("SECRET_KEY")
 ALGORITHM = os.environ.get("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", 30))
 
 
 def create_access_token(data: dict):
@@ -29,5 +33,45 @@ def verify_token(token: str, credentials_exception):
         if email is None:
             raise credentials_exception
         token_data = models.TokenData(email=email)
-    except JWTError:
+    except jwt.PyJWTError:
         raise credentials_exception
+
+
+def token_subject(token: str):
+    """The sub claim of a valid access token, else None."""
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except jwt.PyJWTError:
+        return None
+
+###############################################################################
+## Refresh tokens
+
+def hash_refresh_token(token: str):
+    # Refresh tokens are 384 bits of randomness, so a fast digest is enough and
+    # keeps /token/refresh free of bcrypt.
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def create_refresh_token(db, user_id: int, family_id: str | None = None):
+    """
+    Issue a new refresh token for user_id, stored hashed.
+    Returns the plain token (only ever sent to the client) and the stored row.
+    """
+    token = secrets.token_urlsafe(48)
+    db_token = models.RefreshToken(
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        user_id=user_id,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(db_token)
+    db.flush()
+    return token, db_token
+
+
+def revoke_refresh_token_family(db, family_id: str):
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.family_id == family_id,
+        models.RefreshToken.revoked_at == None,
+    ).update({"revoked_at": datetime.utcnow()}, synchronize_session=False)
@@ -0,0 +1,127 @@
+"""
+The sqladmin site served at /admin. main.py builds it on the first request
+under /admin, so sqladmin and its templates are not loaded at startup.
+"""
+import os
+from os.path import join, dirname
+from datetime import datetime, timedelta
+from typing import Optional
+from dotenv import load_dotenv
+import jwt
+from sqladmin import Admin, ModelView
+from sqladmin.authentication import AuthenticationBackend
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import RedirectResponse
+
+import models
+from database import SessionLocal
+from hashing import Hash
+
+dotenv_path = join(dirname(__file__), '.env')
+load_dotenv(dotenv_path)
+
+SECRET_KEY = os.environ.get("SECRET_KEY")
+ALGORITHM = os.environ.get("ALGORITHM")
+
+###############################################################################
+class AdminAuth(AuthenticationBackend):
+    async def login(self, request: Request) -> bool:
+        form = await request.form()
+        username, password = form["username"], form["password"]
+
+        # Get database session
+        db = SessionLocal()
+        try:
+            # Find user by email
+            user = db.query(models.User).filter(models.User.email == username).first()
+            
+            if not user:
+                return False
+                
+            # Verify password
+            if not Hash.verify(password, user.password):
+                return False
+                
+            # Check if user has admin role
+            if not user.is_admin:
+                return False
+
+            # Generate JWT token
+            access_token = jwt.encode({
+                "sub": user.email,
+                "role": "admin",
+                "exp": datetime.utcnow() + timedelta(minutes=30)
+            }, SECRET_KEY, algorithm=ALGORITHM)
+            
+            # Store token in session
+            request.session.update({"token": access_token})
+            return True
+        finally:
+            db.close()
+
+    async def logout(self, request: Request) -> bool:
+        request.session.clear()
+        return True
+
+    async def authenticate(self, request: Request) -> Optional[RedirectResponse]:
+        token = request.session.get("token")
+        if not token:
+            return RedirectResponse(request.url_for("admin:login"), status_code=302)
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            if payload.get("role") != "admin":
+                return RedirectResponse(request.url_for("admin:login"), status_code=302)
+            return None
+        except Exception:
+            return RedirectResponse(request.url_for("admin:login"), status_code=302)
+
+
+# Admin views
+class UserAdmin(ModelView, model=models.User):
+    column_list = [models.User.id, models.User.name, models.User.email, models.User.is_admin]
+    column_searchable_list = [models.User.name, models.User.email]
+    can_create = True
+    can_edit = True
+    can_delete = True
+    can_view_details = True
+
+class PostAdmin(ModelView, model=models.Post):
+    column_list = [models.Post.id, models.Post.title, models.Post.author_id]
+    column_searchable_list = [models.Post.title]
+    can_create = True
+    can_edit = True
+    can_delete = True
+    can_view_details = True
+
+class PromptAdmin(ModelView, model=models.Prompt):
+    column_list = [models.Prompt.id, models.Prompt.title, models.Prompt.author_id]
+    column_searchable_list = [models.Prompt.title]
+    can_create = True
+    can_edit = True
+    can_delete = True
+    can_view_details = True
+
+class ProjectAdmin(ModelView, model=models.Project):
+    column_list = [models.Project.id, models.Project.title, models.Project.author_id]
+    column_searchable_list = [models.Project.title]
+    can_create = True
+    can_edit = True
+    can_delete = True
+    can_view_details = True
+
+
+def build(engine, base_url: str = "/admin"):
+    """The admin ASGI app, to be mounted at base_url."""
+    admin = Admin(
+        app=Starlette(),
+        engine=engine,
+        authentication_backend=AdminAuth(secret_key=SECRET_KEY),
+        base_url=base_url
+    )
+    # Register admin views
+    admin.add_view(UserAdmin)
+    admin.add_view(PostAdmin)
+    admin.add_view(PromptAdmin)
+    admin.add_view(ProjectAdmin)
+    return admin.admin
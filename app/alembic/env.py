@@ -28,7 +28,8 @@ logger.info(f"Alembic running in environment: {ENV}")
 
 if ENV == "development":
     # Use SQLite for local development
-    SQLALCHEMY_DATABASE_URL = "sqlite:///./blog.db"
+    SQLITE_PATH = os.environ.get("SQLITE_PATH", "./blog.db")
+    SQLALCHEMY_DATABASE_URL = f"sqlite:///{SQLITE_PATH}"
     logger.info(f"Using SQLite database at: {SQLALCHEMY_DATABASE_URL}")
 else:
     # Use PostgreSQL for production
@@ -49,12 +50,17 @@ if config.config_file_name is not None:
 
 target_metadata = SQLModel.metadata
 
+def include_object(object, name, type_, reflected, compare_to):
+    # The SQLite FTS5 tables (and their shadow tables) are managed by search.py.
+    return not (type_ == "table" and reflected and compare_to is None and "_fts" in name)
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -90,7 +96,8 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
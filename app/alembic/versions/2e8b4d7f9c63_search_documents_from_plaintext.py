@@ -0,0 +1,188 @@
+"""search documents from plaintext
+
+d41f8a6c2b95 made compressed bodies index as empty, so compressed prompts and
+projects matched on their title only. The search documents are now written
+by the app from the plaintext title and body (see search.py), and this
+migration indexes the existing rows the same way, decompressing as needed.
+
+PostgreSQL: search_vector becomes a plain tsvector column. Dropping the
+generated column and adding a nullable one does not rewrite the table; the
+backfill updates every row once, and the GIN index is rebuilt CONCURRENTLY.
+
+SQLite: the FTS5 tables keep their own copy of title and body, written by
+the app; a trigger still removes deleted rows.
+
+The backfill is self-contained (table definitions, SQL and the stored text
+format of textcompression.py as of this revision), so it does not change
+with the current models or search code.
+
+Revision ID: 2e8b4d7f9c63
+Revises: 7c2d5e9a4b18
+Create Date: 2026-10-19 20:14:37.290516
+
+"""
+import base64
+import glob
+import os
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '2e8b4d7f9c63'
+down_revision = '7c2d5e9a4b18'
+branch_labels = None
+depends_on = None
+
+TABLES = ['post', 'prompt', 'project']
+BATCH = 1000
+
+# Stored text format (textcompression.py): "\x1fz" + base85(zstd frame) is
+# compressed, "\x1ft" + text escapes plain text starting with "\x1f".
+COMPRESSED = "\x1fz"
+ESCAPED = "\x1ft"
+DICT_DIR = os.getenv(
+    "TEXT_COMPRESSION_DICT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "zstd_dicts"),
+)
+
+_decompressors = None
+
+
+def _decompress(frame):
+    global _decompressors
+    import zstandard
+    if _decompressors is None:
+        _decompressors = {0: zstandard.ZstdDecompressor()}
+        for path in glob.glob(os.path.join(DICT_DIR, "*.zdict")):
+            with open(path, "rb") as f:
+                dictionary = zstandard.ZstdCompressionDict(f.read())
+            _decompressors[dictionary.dict_id()] = zstandard.ZstdDecompressor(dict_data=dictionary)
+    dict_id = zstandard.get_frame_parameters(frame).dict_id
+    if dict_id not in _decompressors:
+        raise ValueError(f"Compressed body needs zstd dictionary {dict_id}, which is not in {DICT_DIR}")
+    return _decompressors[dict_id].decompress(frame)
+
+
+def _plaintext(stored):
+    if stored is None:
+        return ""
+    if stored.startswith(COMPRESSED):
+        return _decompress(base64.b85decode(stored[len(COMPRESSED):])).decode("utf-8")
+    if stored.startswith(ESCAPED):
+        return stored[len(ESCAPED):]
+    return stored
+
+
+def _sqlite_ddl(table):
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5(title, body)",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = old.id; END",
+    ]
+
+
+def _backfill(table, postgres):
+    bind = op.get_bind()
+    rows = sa.table(table, sa.column('id', sa.Integer), sa.column('title', sa.Text), sa.column('body', sa.Text))
+    if postgres:
+        write = sa.text(f"UPDATE {table} SET search_vector = to_tsvector('english', :title || ' ' || :body) WHERE id = :id")
+    else:
+        write = sa.text(f"INSERT INTO {table}_fts(rowid, title, body) VALUES (:id, :title, :body)")
+    after_id = 0
+    while True:
+        batch = bind.execute(
+            sa.select(rows.c.id, rows.c.title, rows.c.body).where(rows.c.id > after_id).order_by(rows.c.id).limit(BATCH)
+        ).all()
+        if not batch:
+            return
+        bind.execute(write, [{"id": id, "title": title or "", "body": _plaintext(body)} for id, title, body in batch])
+        after_id = batch[-1].id
+
+
+def _is_postgres():
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def _drop_postgres_index():
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_search_vector")
+
+
+def _create_postgres_index():
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(f"CREATE INDEX CONCURRENTLY ix_{table}_search_vector ON {table} USING GIN (search_vector)")
+
+
+def _drop_sqlite_fts():
+    for table in TABLES:
+        fts = f"{table}_fts"
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
+        op.execute(f"DROP VIEW IF EXISTS {table}_fts_source")
+
+
+def upgrade() -> None:
+    if _is_postgres():
+        _drop_postgres_index()
+        for table in TABLES:
+            op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
+            op.execute(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector")
+    else:
+        _drop_sqlite_fts()
+        for table in TABLES:
+            for statement in _sqlite_ddl(table):
+                op.execute(statement)
+    for table in TABLES:
+        _backfill(table, _is_postgres())
+    if _is_postgres():
+        _create_postgres_index()
+
+
+# As left by d41f8a6c2b95: compressed bodies index as empty.
+
+def _postgres_body(column):
+    return f"CASE WHEN left({column}, 2) = E'\\x1fz' THEN '' ELSE coalesce({column}, '') END"
+
+
+def _sqlite_body(column):
+    return f"CASE WHEN substr({column}, 1, 2) = char(31, 122) THEN '' ELSE {column} END"
+
+
+def downgrade() -> None:
+    if _is_postgres():
+        _drop_postgres_index()
+        for table in TABLES:
+            op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
+            op.execute(
+                f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('english', coalesce(title, '') || ' ' || {_postgres_body('body')})) STORED"
+            )
+        _create_postgres_index()
+        return
+    _drop_sqlite_fts()
+    new_body, old_body = _sqlite_body('new.body'), _sqlite_body('old.body')
+    for table in TABLES:
+        fts = f"{table}_fts"
+        op.execute(f"CREATE VIEW {table}_fts_source AS SELECT id, title, {_sqlite_body('body')} AS body FROM {table}")
+        op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5(title, body, content='{table}_fts_source', content_rowid='id')")
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, {new_body}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, {old_body}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, {old_body}); "
+            f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, {new_body}); END"
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
@@ -0,0 +1,54 @@
+"""index hot filters
+
+Indexes the columns every list route and every login/auth check filters on,
+and makes user.email unique. On PostgreSQL the indexes are built with
+CREATE INDEX CONCURRENTLY so the tables stay writable; that cannot run inside
+a transaction, hence the autocommit block. The unique index fails if
+duplicate emails already exist; deduplicate them first.
+
+Revision ID: 4b7e9a2c1d30
+Revises: 8c1d2e4f5a61
+Create Date: 2026-10-19 10:41:07.518263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e9a2c1d30'
+down_revision = '8c1d2e4f5a61'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_post_author_id', 'post', ['author_id'], False),
+    ('ix_prompt_author_id', 'prompt', ['author_id'], False),
+    ('ix_project_author_id', 'project', ['author_id'], False),
+    ('ix_user_email', 'user', ['email'], True),
+]
+
+
+def _is_postgres():
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for name, table, columns, unique in INDEXES:
+                op.create_index(op.f(name), table, columns, unique=unique, postgresql_concurrently=True)
+    else:
+        for name, table, columns, unique in INDEXES:
+            op.create_index(op.f(name), table, columns, unique=unique)
+
+
+def downgrade() -> None:
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for name, table, columns, unique in reversed(INDEXES):
+                op.drop_index(op.f(name), table_name=table, postgresql_concurrently=True)
+    else:
+        for name, table, columns, unique in reversed(INDEXES):
+            op.drop_index(op.f(name), table_name=table)
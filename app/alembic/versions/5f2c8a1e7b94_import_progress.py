@@ -0,0 +1,30 @@
+"""import progress
+
+Revision ID: 5f2c8a1e7b94
+Revises: 2e8b4d7f9c63
+Create Date: 2026-10-19 21:02:44.518377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2c8a1e7b94'
+down_revision = '2e8b4d7f9c63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('importprogress',
+    sa.Column('source', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('done', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('importprogress')
@@ -0,0 +1,54 @@
+"""author_id keyset indexes
+
+Replaces the author_id indexes of post, prompt and project with
+(author_id, id) ones. List routes page with WHERE author_id = ? AND id > ?
+ORDER BY id LIMIT n; with author_id alone PostgreSQL reads and sorts all of
+a user's rows for every page, with (author_id, id) it reads just the page.
+The composite index still serves plain author_id lookups, so the single
+column ones are dropped. Built CONCURRENTLY on PostgreSQL, as in 4b7e9a2c1d30.
+
+Revision ID: 7c2d5e9a4b18
+Revises: e6a9c3b1f420
+Create Date: 2026-10-19 19:02:11.604218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2d5e9a4b18'
+down_revision = 'e6a9c3b1f420'
+branch_labels = None
+depends_on = None
+
+TABLES = ['post', 'prompt', 'project']
+
+
+def _is_postgres():
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for table in TABLES:
+                op.create_index(f'ix_{table}_author_id_id', table, ['author_id', 'id'], unique=False, postgresql_concurrently=True)
+                op.drop_index(f'ix_{table}_author_id', table_name=table, postgresql_concurrently=True)
+    else:
+        for table in TABLES:
+            op.create_index(f'ix_{table}_author_id_id', table, ['author_id', 'id'], unique=False)
+            op.drop_index(f'ix_{table}_author_id', table_name=table)
+
+
+def downgrade() -> None:
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for table in reversed(TABLES):
+                op.create_index(f'ix_{table}_author_id', table, ['author_id'], unique=False, postgresql_concurrently=True)
+                op.drop_index(f'ix_{table}_author_id_id', table_name=table, postgresql_concurrently=True)
+    else:
+        for table in reversed(TABLES):
+            op.create_index(f'ix_{table}_author_id', table, ['author_id'], unique=False)
+            op.drop_index(f'ix_{table}_author_id_id', table_name=table)
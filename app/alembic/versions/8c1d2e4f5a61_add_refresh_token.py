@@ -0,0 +1,42 @@
+"""add refresh token
+
+Revision ID: 8c1d2e4f5a61
+Revises: f3e87d145671
+Create Date: 2026-10-19 09:12:31.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1d2e4f5a61'
+down_revision = 'f3e87d145671'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('refreshtoken',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('token_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('family_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+    sa.Column('replaced_by_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_refreshtoken_token_hash'), 'refreshtoken', ['token_hash'], unique=True)
+    op.create_index(op.f('ix_refreshtoken_family_id'), 'refreshtoken', ['family_id'], unique=False)
+    op.create_index(op.f('ix_refreshtoken_user_id'), 'refreshtoken', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_refreshtoken_user_id'), table_name='refreshtoken')
+    op.drop_index(op.f('ix_refreshtoken_family_id'), table_name='refreshtoken')
+    op.drop_index(op.f('ix_refreshtoken_token_hash'), table_name='refreshtoken')
+    op.drop_table('refreshtoken')
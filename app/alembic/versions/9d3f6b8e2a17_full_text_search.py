@@ -0,0 +1,76 @@
+"""full text search
+
+PostgreSQL (12+): adds a generated search_vector tsvector column to post,
+prompt and project, and a GIN index on it built CONCURRENTLY. Adding a stored
+generated column rewrites the table, so run this in a maintenance window on
+large tables.
+
+SQLite: adds an external-content FTS5 table per table, triggers that keep it
+in sync, and fills it from the existing rows.
+
+Revision ID: 9d3f6b8e2a17
+Revises: 4b7e9a2c1d30
+Create Date: 2026-10-19 12:03:55.871042
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3f6b8e2a17'
+down_revision = '4b7e9a2c1d30'
+branch_labels = None
+depends_on = None
+
+TABLES = ['post', 'prompt', 'project']
+
+
+def _is_postgres():
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    if _is_postgres():
+        for table in TABLES:
+            op.execute(
+                f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('english', coalesce(title, '') || ' ' || coalesce(body, ''))) STORED"
+            )
+        with op.get_context().autocommit_block():
+            for table in TABLES:
+                op.execute(f"CREATE INDEX CONCURRENTLY ix_{table}_search_vector ON {table} USING GIN (search_vector)")
+    else:
+        for table in TABLES:
+            fts = f"{table}_fts"
+            op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5(title, body, content='{table}', content_rowid='id')")
+            op.execute(
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+                f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+            )
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for table in TABLES:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_search_vector")
+        for table in TABLES:
+            op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
+    else:
+        for table in TABLES:
+            fts = f"{table}_fts"
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
@@ -0,0 +1,45 @@
+"""row versions
+
+Adds version and updated_at to post, prompt, project, profession and user for
+ETag / Last-Modified support. The application bumps both on every update.
+
+On PostgreSQL (11+) both columns are added with constant/stable defaults, so
+no table rewrite happens. SQLite cannot ADD COLUMN with a non-constant default,
+and batch mode would recreate the tables and drop the full-text triggers, so
+there updated_at is added NOT NULL with a constant placeholder default and
+back-filled.
+
+Revision ID: b5a0c7e3f912
+Revises: 9d3f6b8e2a17
+Create Date: 2026-10-19 14:26:40.330195
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5a0c7e3f912'
+down_revision = '9d3f6b8e2a17'
+branch_labels = None
+depends_on = None
+
+TABLES = ['post', 'prompt', 'project', 'profession', 'user']
+
+
+def upgrade() -> None:
+    postgres = op.get_context().dialect.name == 'postgresql'
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+        if postgres:
+            op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text("(now() at time zone 'utc')")))
+        else:
+            op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False, server_default='1970-01-01 00:00:00'))
+            op.execute(f'UPDATE "{table}" SET updated_at = CURRENT_TIMESTAMP')
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'version')
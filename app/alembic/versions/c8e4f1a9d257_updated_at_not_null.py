@@ -0,0 +1,50 @@
+"""updated_at not null
+
+SQLite databases upgraded through b5a0c7e3f912 before it added updated_at as
+NOT NULL still have a nullable column, which autogenerate reports as drift.
+Those tables are rebuilt with batch mode; that drops their triggers, so the
+search delete triggers of 2e8b4d7f9c63 are created again. Tables that already
+have NOT NULL (and PostgreSQL, where it always was) are left alone.
+
+Revision ID: c8e4f1a9d257
+Revises: 5f2c8a1e7b94
+Create Date: 2026-10-19 22:41:09.615830
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e4f1a9d257'
+down_revision = '5f2c8a1e7b94'
+branch_labels = None
+depends_on = None
+
+TABLES = ['post', 'prompt', 'project', 'profession', 'user']
+SEARCHABLE = ['post', 'prompt', 'project']
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != 'sqlite':
+        return
+    inspector = sa.inspect(op.get_bind())
+    for table in TABLES:
+        column = next(c for c in inspector.get_columns(table) if c['name'] == 'updated_at')
+        if not column['nullable']:
+            continue
+        op.execute(f'UPDATE "{table}" SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL')
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        if table in SEARCHABLE:
+            fts = f"{table}_fts"
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"DELETE FROM {fts} WHERE rowid = old.id; END"
+            )
+
+
+def downgrade() -> None:
+    # Nothing to undo: b5a0c7e3f912 creates the column NOT NULL.
+    pass
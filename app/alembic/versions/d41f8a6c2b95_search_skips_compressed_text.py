@@ -0,0 +1,99 @@
+"""search skips compressed text
+
+Compressed bodies (see textcompression.py) are stored as a 0x1f marker plus
+base85 zstd, which is noise to a full-text index. Rebuild the search objects
+so those bodies index as empty and the rows match on their title only. Run
+this before listing prompt.body or project.body in COMPRESSED_TEXT_COLUMNS.
+
+PostgreSQL: the generated search_vector column is dropped and re-added, which
+rewrites the table (as 9d3f6b8e2a17 did); the GIN index is rebuilt
+CONCURRENTLY.
+
+SQLite: the FTS5 tables now read from a <table>_fts_source view and are
+rebuilt from it.
+
+Revision ID: d41f8a6c2b95
+Revises: b5a0c7e3f912
+Create Date: 2026-10-19 16:08:12.514377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f8a6c2b95'
+down_revision = 'b5a0c7e3f912'
+branch_labels = None
+depends_on = None
+
+TABLES = ['post', 'prompt', 'project']
+
+
+def _is_postgres():
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def _postgres_body(column):
+    return f"CASE WHEN left({column}, 2) = E'\\x1fz' THEN '' ELSE coalesce({column}, '') END"
+
+
+def _sqlite_body(column):
+    return f"CASE WHEN substr({column}, 1, 2) = char(31, 122) THEN '' ELSE {column} END"
+
+
+def _postgres_search_vector(body):
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_search_vector")
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('english', coalesce(title, '') || ' ' || {body})) STORED"
+        )
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(f"CREATE INDEX CONCURRENTLY ix_{table}_search_vector ON {table} USING GIN (search_vector)")
+
+
+def _sqlite_fts(content, new_body, old_body):
+    for table in TABLES:
+        fts = f"{table}_fts"
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
+        if content != '{table}':
+            op.execute(f"CREATE VIEW {content.format(table=table)} AS SELECT id, title, {_sqlite_body('body')} AS body FROM {table}")
+        op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5(title, body, content='{content.format(table=table)}', content_rowid='id')")
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, {new_body}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, {old_body}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, {old_body}); "
+            f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, {new_body}); END"
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    if _is_postgres():
+        _postgres_search_vector(_postgres_body('body'))
+    else:
+        _sqlite_fts('{table}_fts_source', _sqlite_body('new.body'), _sqlite_body('old.body'))
+
+
+def downgrade() -> None:
+    if _is_postgres():
+        _postgres_search_vector("coalesce(body, '')")
+    else:
+        for table in TABLES:
+            op.execute(f"DROP VIEW IF EXISTS {table}_fts_source")
+        _sqlite_fts('{table}', 'new.body', 'old.body')
@@ -0,0 +1,39 @@
+"""user deleted_at
+
+Adds user.deleted_at for asynchronous user deletion (see deletion.py). The
+column is nullable without a default, so adding it does not rewrite the
+table; on PostgreSQL its index is built CONCURRENTLY.
+
+Revision ID: e6a9c3b1f420
+Revises: d41f8a6c2b95
+Create Date: 2026-10-19 17:21:47.208315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a9c3b1f420'
+down_revision = 'd41f8a6c2b95'
+branch_labels = None
+depends_on = None
+
+
+def _is_postgres():
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            op.create_index('ix_user_deleted_at', 'user', ['deleted_at'], unique=False, postgresql_concurrently=True)
+    else:
+        op.create_index('ix_user_deleted_at', 'user', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_deleted_at', table_name='user')
+    op.drop_column('user', 'deleted_at')
@@ -0,0 +1,68 @@
+import os, sys
+import socket
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+import httpx
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def running_server(env=None, workers=1):
+    """
+    Run `uvicorn main:app` against a throwaway SQLite database and yield its
+    base URL. Extra environment variables select the code path under test.
+    """
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        server_env = dict(os.environ)
+        server_env.update({
+            "ENV": "development",
+            "SQLITE_PATH": os.path.join(tmp, "bench.db"),
+            "SECRET_KEY": server_env.get("SECRET_KEY") or "benchmark-secret",
+            "ALGORITHM": server_env.get("ALGORITHM") or "HS256",
+        })
+        server_env.update(env or {})
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning"],
+            cwd=APP_DIR, env=server_env,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.time() + 30
+            while True:
+                try:
+                    httpx.get(base_url + "/")
+                    break
+                except httpx.TransportError:
+                    if time.time() > deadline or proc.poll() is not None:
+                        raise RuntimeError("benchmark server did not start")
+                    time.sleep(0.1)
+            yield base_url
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+def login(base_url, email="bench@example.com", password="bench-password"):
+    """Create the benchmark user if needed and return auth headers."""
+    httpx.post(base_url + "/users/", json={"name": "bench", "email": email, "password": password})
+    response = httpx.post(base_url + "/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def user_id(base_url, email="bench@example.com"):
+    for user in httpx.get(base_url + "/users/").json():
+        if user["email"] == email:
+            return user["id"]
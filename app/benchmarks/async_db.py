@@ -0,0 +1,58 @@
+"""
+Requests per second of GET /posts with the sync (threadpool) handlers versus
+the async handlers from router/aio, at high client concurrency.
+
+    cd app
+    python benchmarks/async_db.py --concurrency 200 --requests 5000
+"""
+import os, sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from _server import running_server, login, user_id
+
+
+async def hammer(base_url, headers, total, concurrency):
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+    errors = 0
+
+    async def worker(client):
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            response = await client.get("/posts", params={"limit": 20})
+            if response.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return total / elapsed, errors
+
+
+def run(mode, args):
+    env = {"DATABASE_ASYNC": "true" if mode == "async" else "false"}
+    with running_server(env) as base_url:
+        headers = login(base_url)
+        author_id = user_id(base_url)
+        for i in range(20):
+            httpx.post(base_url + "/posts/", headers=headers, json={"title": f"post {i}", "body": "x" * 200, "author_id": author_id})
+        rps, errors = asyncio.run(hammer(base_url, headers, args.requests, args.concurrency))
+    print(f"{mode:>5}: {rps:8.1f} req/s  ({errors} errors)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="async_db.py")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    for mode in ("sync", "async"):
+        run(mode, args)
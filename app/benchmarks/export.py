@@ -0,0 +1,81 @@
+"""
+Throughput and server memory of GET /export as the number of rows grows.
+The server's peak RSS should stay flat while rows/s stays in the tens of
+thousands.
+
+    cd app
+    python benchmarks/export.py --rows 10000 100000 300000
+"""
+import os, sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import argparse
+import threading
+import time
+
+import httpx
+import psutil
+
+from _server import running_server, login, user_id
+
+
+class PeakRSS(threading.Thread):
+    """Samples the resident memory of this process's children (the server)."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = 0
+        self.running = True
+
+    def run(self):
+        while self.running:
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    self.peak = max(self.peak, child.memory_info().rss)
+                except psutil.NoSuchProcess:
+                    pass
+            time.sleep(0.02)
+
+
+def seed(base_url, headers, author_id, count):
+    items = [{"title": f"post {i}", "body": "lorem ipsum dolor sit amet " * 8, "author_id": author_id} for i in range(500)]
+    for start in range(0, count, 500):
+        httpx.post(base_url + "/posts/bulk", headers=headers, json=items[: min(500, count - start)], timeout=120).raise_for_status()
+
+
+def export(base_url, headers, gzip):
+    sampler = PeakRSS()
+    sampler.start()
+    lines, size = 0, 0
+    started = time.perf_counter()
+    with httpx.stream("GET", base_url + "/export", headers=headers, params={"types": "post", "gzip": gzip}, timeout=600) as response:
+        response.raise_for_status()
+        for chunk in response.iter_raw():
+            size += len(chunk)
+            if not gzip:
+                lines += chunk.count(b"\n")
+    elapsed = time.perf_counter() - started
+    sampler.running = False
+    sampler.join()
+    return lines, size, elapsed, sampler.peak
+
+
+def run(args):
+    with running_server() as base_url:
+        headers = login(base_url)
+        author_id = user_id(base_url)
+        seeded = 0
+        print(f"{'rows':>10} {'gzip':>5} {'bytes':>14} {'rows/s':>10} {'peak RSS MB':>12}")
+        for rows in sorted(args.rows):
+            seed(base_url, headers, author_id, rows - seeded)
+            seeded = rows
+            for gzip in (False, True):
+                lines, size, elapsed, peak = export(base_url, headers, gzip)
+                if not gzip:
+                    assert lines == rows, (lines, rows)
+                print(f"{rows:>10,} {str(gzip):>5} {size:>14,} {rows / elapsed:>10,.0f} {peak / 2**20:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="export.py")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 300000])
+    run(parser.parse_args())
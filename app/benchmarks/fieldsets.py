@@ -0,0 +1,54 @@
+"""
+Bytes and latency of GET /prompts with full rows versus ?fields=id,title,
+for prompts with large bodies.
+
+    cd app
+    python benchmarks/fieldsets.py --rows 2000 --body-kb 20
+"""
+import os, sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import argparse
+import statistics
+import time
+
+import httpx
+
+from _server import running_server, login, user_id
+
+
+def measure(client, params, repeat):
+    samples, size = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get("/prompts", params=params)
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+        size = len(response.content)
+    return statistics.median(samples) * 1000, size
+
+
+def run(args):
+    with running_server() as base_url:
+        headers = login(base_url)
+        author_id = user_id(base_url)
+        body = ("lorem ipsum dolor sit amet " * (args.body_kb * 40))[: args.body_kb * 1024]
+        items = [{"title": f"prompt {i}", "body": body, "author_id": author_id} for i in range(args.rows)]
+        for start in range(0, len(items), 500):
+            httpx.post(base_url + "/prompts/bulk", headers=headers, json=items[start:start + 500], timeout=120).raise_for_status()
+
+        with httpx.Client(base_url=base_url, headers=headers, timeout=60) as client:
+            full_ms, full_bytes = measure(client, {"limit": 100}, args.repeat)
+            sparse_ms, sparse_bytes = measure(client, {"limit": 100, "fields": "id,title"}, args.repeat)
+
+    print(f"{'':>16} {'bytes':>12} {'median ms':>10}")
+    print(f"{'full rows':>16} {full_bytes:>12,} {full_ms:>10.2f}")
+    print(f"{'fields=id,title':>16} {sparse_bytes:>12,} {sparse_ms:>10.2f}")
+    print(f"saved {1 - sparse_bytes / full_bytes:.1%} of bytes, {1 - sparse_ms / full_ms:.1%} of latency")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="fieldsets.py")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--body-kb", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args())
@@ -0,0 +1,81 @@
+"""
+List-endpoint serialization throughput: FastAPI's default path (validate
+against response_model, jsonable_encoder, json.dumps) versus
+serialization.respond (pick fields, orjson). Runs in process on ORM rows
+loaded from a throwaway SQLite database, and checks both produce the same
+JSON.
+
+    cd app
+    python benchmarks/json_serialization.py --rows 100 --repeat 200
+"""
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlmodel import Session, SQLModel, create_engine, select
+
+import models
+import relations
+import serialization
+
+
+def seed(engine, rows):
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(models.User.__table__.insert(), [
+            {"id": 1, "name": "bench", "email": "bench@example.com", "password": "x", "is_admin": False}
+        ])
+        for model in (models.Post, models.Prompt, models.Project):
+            connection.execute(model.__table__.insert(), [
+                {"title": f"title {i}", "body": "lorem ipsum dolor sit amet " * 20, "author_id": 1} for i in range(rows)
+            ])
+
+
+def default_path(schema, content, exclude_unset):
+    field = create_response_field(name="bench", type_=schema)
+    data = asyncio.run(serialize_response(field=field, response_content=content, exclude_unset=exclude_unset, is_coroutine=True))
+    return JSONResponse(data).body
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    return (time.perf_counter() - started) / repeat, body
+
+
+def run(args):
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    seed(engine, args.rows)
+    with Session(engine) as session:
+        posts = session.exec(select(models.Post).limit(args.rows)).all()
+        sparse = session.query(models.Post.id, models.Post.title).limit(args.rows).all()
+        user = relations.user_with_collections(session, 1, {"posts", "prompts", "projects"}, min(args.rows, 100), {})
+        cases = [
+            ("GET /posts", List[models.PostReadPartial], posts, True),
+            ("GET /posts?fields=id,title", List[models.PostReadPartial], sparse, True),
+            ("GET /users/{id}", models.UserReadWithPosts, user, False),
+        ]
+
+        print(f"{'':>28} {'default ms':>11} {'fast ms':>9} {'speedup':>8}")
+        for name, schema, content, exclude_unset in cases:
+            slow_s, slow_body = timed(lambda: default_path(schema, content, exclude_unset), args.repeat)
+            fast_s, fast_body = timed(lambda: serialization.dump(schema, content, exclude_unset), args.repeat)
+            assert json.loads(slow_body) == json.loads(fast_body), name
+            print(f"{name:>28} {slow_s * 1000:>11.3f} {fast_s * 1000:>9.3f} {slow_s / fast_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="json_serialization.py")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    run(parser.parse_args())
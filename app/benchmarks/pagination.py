@@ -0,0 +1,80 @@
+"""
+Per-page latency of offset versus keyset (cursor) pagination for the
+GET /posts query at increasing page depths, up to 1M rows.
+
+    cd app
+    python benchmarks/pagination.py --rows 1000000
+"""
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import statistics
+import tempfile
+import time
+
+PAGE = 100
+AUTHOR_ID = 1
+
+
+def seed(engine, rows):
+    import models
+    from sqlmodel import SQLModel
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(models.User.__table__.insert(), [
+            {"id": AUTHOR_ID, "name": "bench", "email": "bench@example.com", "password": "x", "is_admin": False}
+        ])
+        batch = 50_000
+        for start in range(0, rows, batch):
+            connection.execute(models.Post.__table__.insert(), [
+                {"title": f"post {i}", "body": "x" * 200, "author_id": AUTHOR_ID}
+                for i in range(start, min(start + batch, rows))
+            ])
+
+
+def timed(session, statement, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = session.exec(statement).all()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, rows
+
+
+def run(args):
+    import models
+    import pagination
+    from database import engine
+    from sqlmodel import Session, select
+
+    print(f"seeding {args.rows:,} posts...")
+    seed(engine, args.rows)
+
+    base = select(models.Post).where(models.Post.author_id == AUTHOR_ID)
+    print(f"{'depth':>10} {'offset ms':>10} {'keyset ms':>10}")
+    with Session(engine) as session:
+        depth = 0
+        while depth < args.rows:
+            offset_ms, _ = timed(session, base.order_by(models.Post.id).offset(depth).limit(PAGE), args.repeat)
+            # The cursor a client would hold after reading `depth` rows
+            last_id = session.exec(base.order_by(models.Post.id).offset(max(depth - 1, 0)).limit(1)).first().id
+            cursor = pagination.encode_cursor(last_id) if depth else None
+            keyset_ms, _ = timed(session, pagination.keyset(base, models.Post.id, cursor).limit(PAGE), args.repeat)
+            print(f"{depth:>10,} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+            depth = depth * 10 if depth else 1000
+        last = args.rows - PAGE
+        offset_ms, _ = timed(session, base.order_by(models.Post.id).offset(last).limit(PAGE), args.repeat)
+        last_id = session.exec(base.order_by(models.Post.id).offset(last - 1).limit(1)).first().id
+        keyset_ms, _ = timed(session, pagination.keyset(base, models.Post.id, pagination.encode_cursor(last_id)).limit(PAGE), args.repeat)
+        print(f"{last:>10,} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="pagination.py")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["ENV"] = "development"
+        os.environ["SQLITE_PATH"] = os.path.join(tmp, "pagination.db")
+        run(args)
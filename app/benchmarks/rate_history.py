@@ -0,0 +1,90 @@
+"""
+Query latency of the historical currency store. Writes years of hourly rates
+for a few currencies into a throwaway directory, then times rate-at-date and
+full-span range queries (raw, daily, weekly) with cold and warm maps. Range
+queries over all years should take single-digit milliseconds.
+
+    cd app
+    python benchmarks/rate_history.py --years 10 --repeat 50
+"""
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import currency_history
+
+CODES = ["EUR", "GBP", "JPY", "CHF"]
+
+
+def seed(store, years: int, step: int):
+    end = datetime(2025, 1, 1)
+    start = datetime(end.year - years, 1, 1)
+    count = 0
+    for code in CODES:
+        walk = 1.0
+        for year in range(start.year, end.year):
+            t0 = currency_history.epoch(datetime(year, 1, 1))
+            t1 = currency_history.epoch(datetime(year + 1, 1, 1))
+            times = np.arange(t0, t1, step, dtype=np.int64)
+            values = walk * np.exp(np.cumsum(np.random.normal(0, 0.001, len(times))))
+            walk = float(values[-1])
+            records = np.empty(len(times), dtype=currency_history.RECORD)
+            records["t"], records["v"] = times, values
+            os.makedirs(os.path.dirname(store._path(code, year)), exist_ok=True)
+            records.tofile(store._path(code, year))
+            count += len(records)
+    return start, end - timedelta(seconds=1), count
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, samples
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as directory:
+        store = currency_history.HistoryStore(directory)
+        start, end, count = seed(store, args.years, args.step)
+        size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(directory) for f in files)
+        print(f"{count:,} records in {size / 2**20:.1f} MB, {args.years} years, every {args.step}s\n")
+        print(f"{'query':<28} {'points':>9} {'cold ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+
+        span = (end - start).total_seconds()
+        queries = [
+            ("rate at date", lambda: store.rate_at(random.choice(CODES), start + timedelta(seconds=random.random() * span))),
+        ] + [
+            (f"range {interval}", lambda interval=interval: store.range(random.choice(CODES), start, end, interval))
+            for interval in currency_history.INTERVALS
+        ]
+        for name, query in queries:
+            # Cold: a fresh store has no maps open yet (the page cache may still be warm).
+            cold_store = currency_history.HistoryStore(directory)
+            started = time.perf_counter()
+            if name == "rate at date":
+                cold_store.rate_at(CODES[0], end)
+            else:
+                cold_store.range(CODES[0], start, end, name.split()[-1])
+            cold = (time.perf_counter() - started) * 1000
+            result, samples = timed(query, args.repeat)
+            points = 1 if name == "rate at date" else len(result[0])
+            p95 = statistics.quantiles(samples, n=20)[-1]
+            print(f"{name:<28} {points:>9,} {cold:>9.2f} {statistics.median(samples):>9.2f} {p95:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="rate_history.py")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--step", type=int, default=3600, help="seconds between recorded snapshots")
+    parser.add_argument("--repeat", type=int, default=50)
+    run(parser.parse_args())
@@ -0,0 +1,111 @@
+"""
+Cold start: how long `import main` takes in a fresh interpreter, and how long
+from launching uvicorn until the first request is answered. Also checks that
+the optional heavy packages (openai, sqladmin, numpy, ...) are not loaded
+until a request needs them. Exits non-zero when a median is over its budget
+or a lazy package was imported at startup, so it can gate CI.
+
+    cd app
+    python benchmarks/startup.py --runs 5 --import-budget 1.2 --first-request-budget 2.5
+"""
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+from _server import APP_DIR, free_port
+
+# Must stay out of sys.modules after `import main`.
+LAZY = ["openai", "sqladmin", "numpy", "pyarrow", "msgpack", "zstandard", "brotli", "currency_history", "jose"]
+
+MEASURE_IMPORT = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {LAZY!r} if m in sys.modules]}}))
+"""
+
+
+def environment(tmp):
+    env = dict(os.environ)
+    env.update({
+        "ENV": "development",
+        "SQLITE_PATH": os.path.join(tmp, "bench.db"),
+        "SECRET_KEY": env.get("SECRET_KEY") or "benchmark-secret",
+        "ALGORITHM": env.get("ALGORITHM") or "HS256",
+    })
+    return env
+
+
+def import_time(env):
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE_IMPORT], cwd=APP_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def first_request_time(env):
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=APP_DIR, env=env,
+    )
+    try:
+        deadline = started + 30
+        while True:
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/").raise_for_status()
+                return time.perf_counter() - started
+            except httpx.TransportError:
+                if time.perf_counter() > deadline or proc.poll() is not None:
+                    raise RuntimeError("server did not start")
+                time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run(args):
+    imports, first_requests, loaded = [], [], set()
+    for _ in range(args.runs):
+        # A new database each run, so startup always creates the tables.
+        with tempfile.TemporaryDirectory() as tmp:
+            env = environment(tmp)
+            measured = import_time(env)
+            imports.append(measured["seconds"])
+            loaded.update(measured["loaded"])
+        with tempfile.TemporaryDirectory() as tmp:
+            first_requests.append(first_request_time(environment(tmp)))
+
+    failures = []
+    print(f"{'':<16} {'median s':>9} {'max s':>9} {'budget s':>9}")
+    for name, samples, budget in [
+        ("import main", imports, args.import_budget),
+        ("first request", first_requests, args.first_request_budget),
+    ]:
+        median = statistics.median(samples)
+        print(f"{name:<16} {median:>9.3f} {max(samples):>9.3f} {budget:>9.3f}")
+        if median > budget:
+            failures.append(f"{name} took {median:.3f}s, over the {budget}s budget")
+    if loaded:
+        failures.append(f"imported at startup, should be lazy: {', '.join(sorted(loaded))}")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="startup.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=1.2, help="seconds, median of runs")
+    parser.add_argument("--first-request-budget", type=float, default=2.5, help="seconds, median of runs")
+    run(parser.parse_args())
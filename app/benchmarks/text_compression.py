@@ -0,0 +1,111 @@
+"""
+Storage and read latency of prompt bodies stored plain, zstd-compressed, and
+zstd-compressed with a trained dictionary (textcompression.py).
+
+Each mode writes the same synthetic prompts into its own throwaway SQLite
+database through the Prompt model, then reports the database size after
+VACUUM and the median time to load a page of 100 prompts.
+
+    cd app
+    python benchmarks/text_compression.py --rows 20000 --body-kb 4
+"""
+import os, sys
+import tempfile
+
+DICT_DIR = tempfile.mkdtemp()
+os.environ["TEXT_COMPRESSION_DICT_DIR"] = DICT_DIR
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine, select
+
+import models
+import textcompression
+
+TEMPLATES = [
+    "You are a {role}. Answer questions about {topic} for a {audience}. Keep answers under {n} words, "
+    "cite sources when you can, and ask a clarifying question if the request is ambiguous. ",
+    "Step {n}: review the {topic} notes, list open questions for the {role}, and summarise the "
+    "decisions made so far in plain language for a {audience}. ",
+    "Rewrite the following {topic} draft for a {audience}. Preserve the meaning, fix grammar, "
+    "remove jargon, and keep the tone of a {role}. ",
+]
+ROLES = ["football analyst", "scout", "coach", "data engineer", "journalist", "physio"]
+TOPICS = ["transfers", "set pieces", "pressing", "injuries", "youth academy", "xG models", "tactics"]
+AUDIENCES = ["beginner", "club board", "fan newsletter", "technical staff"]
+
+
+def prompt_body(rng, size):
+    parts, length = [], 0
+    while length < size:
+        part = rng.choice(TEMPLATES).format(
+            role=rng.choice(ROLES), topic=rng.choice(TOPICS), audience=rng.choice(AUDIENCES), n=rng.randint(1, 500)
+        )
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)[:size]
+
+
+def run_mode(bodies, repeat):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine, tables=[models.User.__table__, models.Prompt.__table__])
+    with Session(engine) as session:
+        session.add(models.User(id=1, name="bench", email="bench@example.com", password="x"))
+        session.commit()
+        started = time.perf_counter()
+        for start in range(0, len(bodies), 1000):
+            session.execute(models.Prompt.__table__.insert(), [
+                {"title": f"prompt {start + i}", "body": body, "author_id": 1}
+                for i, body in enumerate(bodies[start:start + 1000])
+            ])
+        session.commit()
+        write_s = time.perf_counter() - started
+
+        samples = []
+        rng = random.Random(1)
+        for _ in range(repeat):
+            offset = rng.randrange(0, max(1, len(bodies) - 100))
+            started = time.perf_counter()
+            rows = session.exec(select(models.Prompt).offset(offset).limit(100)).all()
+            assert sum(len(r.body) for r in rows)
+            samples.append(time.perf_counter() - started)
+            session.expunge_all()
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+    engine.dispose()
+    return os.path.getsize(path), write_s, statistics.median(samples) * 1000
+
+
+def run(args):
+    rng = random.Random(0)
+    bodies = [prompt_body(rng, args.body_kb * 1024) for _ in range(args.rows)]
+
+    results = {}
+    textcompression.COMPRESSED_TEXT_COLUMNS.clear()
+    results["plain"] = run_mode(bodies, args.repeat)
+
+    textcompression.COMPRESSED_TEXT_COLUMNS.add("prompt.body")
+    textcompression.reload()
+    results["zstd"] = run_mode(bodies, args.repeat)
+
+    textcompression.train_dictionary(rng.sample(bodies, min(len(bodies), 2000)), dict_dir=DICT_DIR)
+    results["zstd + dictionary"] = run_mode(bodies, args.repeat)
+
+    plain_size = results["plain"][0]
+    print(f"{args.rows:,} prompts of {args.body_kb} KB")
+    print(f"{'':>18} {'db bytes':>14} {'ratio':>7} {'write s':>9} {'page ms':>9}")
+    for name, (size, write_s, read_ms) in results.items():
+        print(f"{name:>18} {size:>14,} {size / plain_size:>7.1%} {write_s:>9.2f} {read_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="text_compression.py")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--body-kb", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=50)
+    run(parser.parse_args())
@@ -0,0 +1,183 @@
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import joinedload
+import models
+import search
+
+###############################################################################
+## Bulk create / update / delete
+#
+# Each call validates every item first, reports the ones that fail with their
+# index, and writes the rest with a handful of set-based statements in the
+# caller's transaction. Functions take a sync Session; the async routers call
+# them through AsyncSession.run_sync.
+
+BULK_MAX_ITEMS = 1000
+INSERT_CHUNK = 500
+READ_MAX_IDS = 100
+
+
+def _check_size(items):
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_MAX_ITEMS} items per bulk request, got {len(items)}",
+        )
+
+
+def _parse(items, schema):
+    """Validate raw items against schema. Returns ([(index, obj)], [errors])."""
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.parse_obj(item)))
+        except ValidationError as e:
+            errors.append(models.BulkItemError(index=index, id=_item_id(item), detail=e.errors()))
+    return valid, errors
+
+
+def _item_id(item):
+    try:
+        return int(item.get("id"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _missing_authors(session, author_ids):
+    author_ids = {a for a in author_ids if a is not None}
+    if not author_ids:
+        return set()
+    found = session.execute(select(models.User.id).where(models.User.id.in_(author_ids))).scalars().all()
+    return author_ids - set(found)
+
+
+def _select_rows(session, model, ids):
+    if not ids:
+        return []
+    rows = session.execute(select(model).where(model.id.in_(ids))).scalars().all()
+    by_id = {row.id: row for row in rows}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def create(session, model, schema, items):
+    _check_size(items)
+    valid, errors = _parse(items, schema)
+
+    missing = _missing_authors(session, (obj.author_id for _, obj in valid))
+    rows = []
+    for index, obj in valid:
+        if obj.author_id in missing:
+            errors.append(models.BulkItemError(index=index, detail=f"User with id {obj.author_id} not found"))
+        else:
+            rows.append(obj.dict())
+
+    table = model.__table__
+    documents = []
+    if session.get_bind().dialect.name == "postgresql":
+        # One multi-row INSERT ... VALUES ... RETURNING per chunk. RETURNING
+        # order need not follow VALUES, so the indexed columns come back too.
+        for start in range(0, len(rows), INSERT_CHUNK):
+            result = session.execute(
+                insert(table).values(rows[start:start + INSERT_CHUNK]).returning(table.c.id, table.c.title, table.c.body)
+            )
+            documents.extend(tuple(row) for row in result)
+    else:
+        # SQLAlchemy 1.4 has no RETURNING for SQLite; executemany cannot report
+        # generated keys, so insert row by row inside the same transaction.
+        statement = insert(table)
+        for row in rows:
+            id = session.execute(statement, row).inserted_primary_key[0]
+            documents.append((id, row["title"], row["body"]))
+    search.index_documents(session.connection(), table.name, documents)
+    created_ids = [id for id, _, _ in documents]
+    session.commit()
+
+    errors.sort(key=lambda e: e.index)
+    return {"items": _select_rows(session, model, created_ids), "errors": errors}
+
+
+def update_many(session, model, schema, items):
+    _check_size(items)
+    valid, errors = _parse(items, schema)
+
+    changes = []
+    for index, obj in valid:
+        data = obj.dict(exclude_unset=True)
+        item_id = _item_id(data)
+        if item_id is None:
+            errors.append(models.BulkItemError(index=index, detail="id is required"))
+            continue
+        data.pop("id")
+        changes.append((index, item_id, data))
+
+    existing = set(session.execute(
+        select(model.id).where(model.id.in_({item_id for _, item_id, _ in changes}))
+    ).scalars().all()) if changes else set()
+    missing_authors = _missing_authors(session, (data.get("author_id") for _, _, data in changes))
+
+    # executemany one UPDATE per distinct set of changed columns
+    groups = {}
+    updated_ids = []
+    for index, item_id, data in changes:
+        if item_id not in existing:
+            errors.append(models.BulkItemError(index=index, id=item_id, detail=f"{model.__name__} with id {item_id} not found"))
+        elif data.get("author_id") in missing_authors:
+            errors.append(models.BulkItemError(index=index, id=item_id, detail=f"User with id {data['author_id']} not found"))
+        else:
+            groups.setdefault(tuple(sorted(data)), []).append(dict(data, _id=item_id))
+            updated_ids.append(item_id)
+
+    table = model.__table__
+    for columns, params in groups.items():
+        if not columns:
+            continue
+        statement = update(table).where(table.c.id == bindparam("_id")).values({c: bindparam(c) for c in columns})
+        session.execute(statement, params)
+    if any("title" in columns or "body" in columns for columns in groups):
+        search.reindex(session.connection(), table.name, ids=updated_ids)
+    session.commit()
+
+    errors.sort(key=lambda e: e.index)
+    return {"items": _select_rows(session, model, list(dict.fromkeys(updated_ids))), "errors": errors}
+
+
+def delete_many(session, model, ids):
+    _check_size(ids)
+    existing = set(session.execute(select(model.id).where(model.id.in_(ids))).scalars().all()) if ids else set()
+    errors = [
+        models.BulkItemError(index=index, id=item_id, detail=f"{model.__name__} with id {item_id} not found")
+        for index, item_id in enumerate(ids) if item_id not in existing
+    ]
+    if existing:
+        session.execute(delete(model.__table__).where(model.__table__.c.id.in_(existing)))
+    session.commit()
+    return {"deleted": [i for i in dict.fromkeys(ids) if i in existing], "errors": errors}
+
+
+def parse_ids(ids: str):
+    """ids query parameter ("1,2,3") as a list of ints, in the given order."""
+    try:
+        parsed = [int(i) for i in ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be comma separated integers")
+    if len(parsed) > READ_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {READ_MAX_IDS} ids per request, got {len(parsed)}",
+        )
+    return parsed
+
+
+def read_many(session, model, ids):
+    """Rows for ids with their authors, one query. Missing ids give None plus an error."""
+    rows = session.execute(
+        select(model).where(model.id.in_(set(ids))).options(joinedload(model.author))
+    ).scalars().all() if ids else []
+    by_id = {row.id: row for row in rows}
+    items, errors = [], []
+    for index, item_id in enumerate(ids):
+        items.append(by_id.get(item_id))
+        if item_id not in by_id:
+            errors.append(models.BulkItemError(index=index, id=item_id, detail=f"{model.__name__} with id {item_id} not found"))
+    return {"items": items, "errors": errors}
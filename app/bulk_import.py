@@ -0,0 +1,276 @@
+"""
+Bulk loader for users, posts, prompts and projects.
+
+    cd app
+    python bulk_import.py --users users.jsonl --posts posts.csv --prompts prompts.jsonl --projects projects.csv
+
+Each input is JSON Lines (.jsonl / .ndjson) or CSV with a header row.
+
+    users:                      name, email, password (plain text) or password_hash, is_admin
+    posts, prompts, projects:   title, body, author_email or author_id
+
+Users are loaded first, so content can refer to the users of the same run by
+email. Plain passwords are bcrypt-hashed in a process pool; author emails are
+resolved to ids with one query per batch. Rows go in with COPY on PostgreSQL
+and batched executemany inserts on SQLite, one transaction per batch.
+
+The number of records done per input is saved in the importprogress table,
+in the same transaction as the batch it counts, so it never disagrees with
+what was loaded. Running the same command again after a failure continues
+from there (--restart ignores it). Users whose email already exists are
+skipped as well.
+"""
+import os, sys
+import argparse
+import csv
+import io
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import func, select
+
+from database import engine
+from hashing import Hash
+import models
+import search
+from textcompression import CompressedText
+
+CONTENT = {
+    "posts": models.Post,
+    "prompts": models.Prompt,
+    "projects": models.Project,
+}
+
+
+class LoadError(Exception):
+    pass
+
+
+def read_records(path: str):
+    if path.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        raise LoadError(f"{path}:{number}: {e}")
+    elif path.endswith(".csv"):
+        with open(path, encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+    else:
+        raise LoadError(f"{path}: expected a .jsonl, .ndjson or .csv file")
+
+
+def require(path, number, record, *keys):
+    missing = [k for k in keys if record.get(k) in (None, "")]
+    if missing:
+        raise LoadError(f"{path}: record {number}: missing {', '.join(missing)}")
+
+
+def batches(records, size: int):
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+###############################################################################
+## Progress
+
+def progress_source(path: str):
+    return os.path.abspath(path)
+
+
+def load_progress(path: str):
+    progress = models.ImportProgress.__table__
+    with engine.connect() as connection:
+        done = connection.execute(
+            select(progress.c.done).where(progress.c.source == progress_source(path))
+        ).scalar()
+    return done or 0
+
+
+def save_progress(connection, path: str, done: int):
+    progress = models.ImportProgress.__table__
+    values = {"done": done, "updated_at": datetime.utcnow()}
+    updated = connection.execute(
+        progress.update().where(progress.c.source == progress_source(path)).values(values)
+    )
+    if updated.rowcount == 0:
+        connection.execute(progress.insert().values(source=progress_source(path), **values))
+
+
+class Reporter:
+    def __init__(self, label: str, done: int):
+        self.label = label
+        self.start_done = done
+        self.started = time.perf_counter()
+
+    def update(self, done: int, inserted: int, skipped: int):
+        elapsed = time.perf_counter() - self.started
+        rate = (done - self.start_done) / elapsed if elapsed else 0
+        print(f"\r{self.label}: {done:,} records, {inserted:,} inserted, {skipped:,} skipped, {rate:,.0f}/s",
+              end="", file=sys.stderr, flush=True)
+
+    def finish(self):
+        print(file=sys.stderr)
+
+
+###############################################################################
+## Writers
+
+def _copy_field(value):
+    # Unquoted empty is NULL in COPY ... CSV, a quoted "" is an empty string.
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _stored(table, row):
+    """COPY skips column types, so compress CompressedText values here."""
+    for c in table.columns:
+        if isinstance(c.type, CompressedText) and c.name in row:
+            row[c.name] = c.type.process_bind_param(row[c.name], engine.dialect)
+    return row
+
+
+def insert_rows(connection, table, rows):
+    if not rows:
+        return
+    if connection.dialect.name == "postgresql":
+        names = list(rows[0])
+        buffer = io.StringIO()
+        for row in rows:
+            row = _stored(table, dict(row))
+            buffer.write(",".join(_copy_field(row[n]) for n in names) + "\n")
+        buffer.seek(0)
+        with connection.connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY "{table.name}" ({", ".join(names)}) FROM STDIN WITH (FORMAT csv)', buffer)
+    else:
+        connection.execute(table.insert(), rows)
+
+
+def existing_emails(emails):
+    with engine.connect() as connection:
+        rows = connection.execute(select(models.User.id, models.User.email).where(models.User.email.in_(emails)))
+        return {email: id for id, email in rows}
+
+
+###############################################################################
+## Loaders
+
+def hash_password(password: str):
+    return Hash.bcrypt(password)
+
+
+def load_users(path, args, pool):
+    table = models.User.__table__
+    done = 0 if args.restart else load_progress(path)
+    inserted, skipped = 0, 0
+    reporter = Reporter(f"users {path}", done)
+    for batch in batches(islice(read_records(path), done, None), args.batch):
+        for number, record in enumerate(batch, done + 1):
+            require(path, number, record, "name", "email")
+            if not record.get("password_hash"):
+                require(path, number, record, "password")
+        emails = {r["email"] for r in batch}
+        known = existing_emails(list(emails))
+        fresh, seen = [], set()
+        for record in batch:
+            if record["email"] in known or record["email"] in seen:
+                continue
+            seen.add(record["email"])
+            fresh.append(record)
+        plain = [r for r in fresh if not r.get("password_hash")]
+        hashes = iter(pool.map(hash_password, [r["password"] for r in plain], chunksize=16))
+        now = datetime.utcnow()
+        rows = []
+        for record in fresh:
+            password = record.get("password_hash") or next(hashes)
+            rows.append({
+                "name": record["name"],
+                "email": record["email"],
+                "password": password,
+                "is_admin": str(record.get("is_admin", False)).lower() in ("1", "true", "yes"),
+                "version": 1,
+                "updated_at": now,
+            })
+        with engine.begin() as connection:
+            insert_rows(connection, table, rows)
+            save_progress(connection, path, done + len(batch))
+        done += len(batch)
+        inserted += len(rows)
+        skipped += len(batch) - len(rows)
+        reporter.update(done, inserted, skipped)
+    reporter.finish()
+
+
+def load_content(kind, path, args):
+    table = CONTENT[kind].__table__
+    done = 0 if args.restart else load_progress(path)
+    inserted = 0
+    reporter = Reporter(f"{kind} {path}", done)
+    authors = {}
+    for batch in batches(islice(read_records(path), done, None), args.batch):
+        missing = {r["author_email"] for r in batch if r.get("author_email") and r["author_email"] not in authors}
+        if missing:
+            authors.update(existing_emails(list(missing)))
+        now = datetime.utcnow()
+        rows = []
+        for number, record in enumerate(batch, done + 1):
+            require(path, number, record, "title", "body")
+            if record.get("author_email"):
+                author_id = authors.get(record["author_email"])
+                if author_id is None:
+                    raise LoadError(f"{path}: record {number}: no user with email {record['author_email']}")
+            elif record.get("author_id") not in (None, ""):
+                author_id = int(record["author_id"])
+            else:
+                raise LoadError(f"{path}: record {number}: needs author_email or author_id")
+            rows.append({"title": record["title"], "body": record["body"], "author_id": author_id, "version": 1, "updated_at": now})
+        with engine.begin() as connection:
+            # Rows loaded by COPY skip the ORM, so index them here, in the same transaction.
+            last_id = connection.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar()
+            insert_rows(connection, table, rows)
+            search.reindex(connection, table.name, after_id=last_id)
+            save_progress(connection, path, done + len(batch))
+        done += len(batch)
+        inserted += len(rows)
+        reporter.update(done, inserted, 0)
+    reporter.finish()
+
+
+def main(args):
+    if args.users:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for path in args.users:
+                load_users(path, args, pool)
+    for kind in CONTENT:
+        for path in getattr(args, kind) or []:
+            load_content(kind, path, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="bulk_import.py")
+    parser.add_argument("--users", nargs="+", metavar="FILE")
+    parser.add_argument("--posts", nargs="+", metavar="FILE")
+    parser.add_argument("--prompts", nargs="+", metavar="FILE")
+    parser.add_argument("--projects", nargs="+", metavar="FILE")
+    parser.add_argument("--batch", type=int, default=5000, help="records per transaction")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes hashing passwords")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress and start from the top")
+    args = parser.parse_args()
+    try:
+        main(args)
+    except LoadError as e:
+        sys.exit(f"\n{e}\nFix the input and run the same command again to resume.")
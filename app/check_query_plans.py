@@ -0,0 +1,131 @@
+"""
+Query plan regression check.
+
+Seeds a database with users, posts, prompts and projects, runs EXPLAIN on the
+queries behind login, auth and the list/detail routes, and exits non-zero if
+any of them falls back to a full table scan or sorts its rows (list pages are
+ordered by id, which an (author_id, id) index returns presorted).
+
+In development (ENV=development) a throwaway SQLite file is migrated with
+`alembic upgrade head`, so the migrations themselves are checked. Otherwise the
+configured PostgreSQL database is used; seeding happens inside a transaction
+that is rolled back, and sequential scans are disabled so the planner picks an
+index whenever one exists.
+
+    cd app
+    python check_query_plans.py
+"""
+import os, sys
+import json
+import tempfile
+from os.path import join, dirname
+
+USERS = 200
+ROWS_PER_USER = 50
+
+
+def main_queries(models, select):
+    user_id = USERS // 2
+    return {
+        "login / auth user by email": select(models.User).where(models.User.email == f"user{user_id}@example.com"),
+        "list posts": select(models.Post).where(models.Post.author_id == user_id).order_by(models.Post.id).limit(101),
+        "list prompts": select(models.Prompt).where(models.Prompt.author_id == user_id).order_by(models.Prompt.id).limit(101),
+        "list projects": select(models.Project).where(models.Project.author_id == user_id).order_by(models.Project.id).limit(101),
+        "list posts, next page": select(models.Post).where(
+            models.Post.author_id == user_id, models.Post.id > ROWS_PER_USER * user_id
+        ).order_by(models.Post.id).limit(101),
+        "read post": select(models.Post).where(models.Post.id == user_id),
+        "read post versions, with author": select(
+            models.Post.version, models.Post.updated_at, models.User.id, models.User.version, models.User.updated_at
+        ).outerjoin(models.User, models.User.id == models.Post.author_id).where(models.Post.id == user_id),
+        "refresh token lookup": select(models.RefreshToken).where(models.RefreshToken.token_hash == "0" * 64),
+    }
+
+
+def seed(connection, models):
+    connection.execute(models.User.__table__.insert(), [
+        {"id": i, "name": f"user{i}", "email": f"user{i}@example.com", "password": "x", "is_admin": False}
+        for i in range(1, USERS + 1)
+    ])
+    for model in (models.Post, models.Prompt, models.Project):
+        connection.execute(model.__table__.insert(), [
+            {"title": f"title {u}-{n}", "body": "body", "author_id": u}
+            for u in range(1, USERS + 1) for n in range(ROWS_PER_USER)
+        ])
+
+
+def sqlite_full_scans(connection, sql):
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    details = [row[-1] for row in rows]
+    return details, [
+        d for d in details
+        if (d.startswith("SCAN") and "CONSTANT ROW" not in d) or d.startswith("USE TEMP B-TREE")
+    ]
+
+
+def postgres_full_scans(connection, sql):
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes, scans = [], []
+    stack = [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        label = f"{node['Node Type']} on {node.get('Relation Name', '-')}"
+        nodes.append(label)
+        if node["Node Type"] in ("Seq Scan", "Sort"):
+            scans.append(label)
+        stack.extend(node.get("Plans", []))
+    return nodes, scans
+
+
+def check(connection, models, select):
+    import deletion
+    dialect = connection.dialect
+    full_scans = sqlite_full_scans if dialect.name == "sqlite" else postgres_full_scans
+    failures = 0
+    for name, statement in main_queries(models, select).items():
+        # as the API runs it, without deleted users' rows
+        statement = deletion.visible(statement)
+        sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        plan, scans = full_scans(connection, sql)
+        status = "FAIL" if scans else "ok"
+        failures += bool(scans)
+        print(f"[{status:>4}] {name}: {'; '.join(plan)}")
+    return failures
+
+
+def run():
+    from dotenv import load_dotenv
+    load_dotenv(join(dirname(__file__), '.env'))
+
+    if os.environ.get("ENV", "development") == "development":
+        tmp = tempfile.TemporaryDirectory()
+        os.environ["SQLITE_PATH"] = join(tmp.name, "plans.db")
+        from alembic import command
+        from alembic.config import Config
+        command.upgrade(Config(join(dirname(__file__), "alembic.ini")), "head")
+
+    import models
+    from database import engine
+    from sqlmodel import select
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            seed(connection, models)
+            connection.exec_driver_sql("ANALYZE")
+            if connection.dialect.name == "postgresql":
+                connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            failures = check(connection, models, select)
+        finally:
+            transaction.rollback()
+
+    if failures:
+        print(f"{failures} queries fall back to a full table scan or sort")
+        sys.exit(1)
+    print("All queries use an index")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,145 @@
+"""
+Online migration for compressed text columns (see textcompression.py).
+
+    cd app
+    python compress_text.py status
+    python compress_text.py train prompt.body project.body --samples 5000
+    python compress_text.py compress prompt.body --batch 500 --pause 0.05
+    python compress_text.py decompress prompt.body
+
+`train` builds a zstd dictionary from existing rows. `compress` and
+`decompress` rewrite existing rows in small id-ordered batches, one short
+transaction each, while the API keeps serving: a row changed concurrently
+(its version moved) is skipped, since the API already stored it in the current
+format. version and updated_at are left alone, so ETags do not change. Both
+can be stopped and resumed with --start-id.
+
+To switch a column on: train, add it to COMPRESSED_TEXT_COLUMNS and restart
+the API so new writes are compressed, then run `compress`. To switch it off:
+remove it, restart, then run `decompress`. prompt.body and project.body need
+migration 2e8b4d7f9c63 first: search documents are then written from the
+plaintext, so rewriting the stored format leaves them as they are.
+"""
+import os, sys
+import argparse
+import time
+
+from sqlalchemy import bindparam, column, func, select, table
+from sqlalchemy.types import TEXT
+from sqlmodel import SQLModel
+
+from database import engine
+import models
+import textcompression
+from textcompression import CompressedText
+
+
+def compressed_columns():
+    return {
+        f"{t.name}.{c.name}": (t.name, c.name)
+        for t in SQLModel.metadata.tables.values()
+        for c in t.columns
+        if isinstance(c.type, CompressedText)
+    }
+
+
+def raw_table(name: str):
+    """(table, column) as stored, without CompressedText decoding."""
+    table_name, column_name = compressed_columns()[name]
+    t = table(table_name, column("id"), column("version"), column(column_name, TEXT))
+    return t, t.c[column_name]
+
+
+def status(args):
+    print(f"{'column':<24} {'enabled':>8} {'rows':>10} {'compressed':>11} {'stored bytes':>14}")
+    with engine.connect() as connection:
+        for name in sorted(compressed_columns()):
+            t, c = raw_table(name)
+            rows, stored = connection.execute(select(func.count(), func.coalesce(func.sum(func.length(c)), 0)).select_from(t)).one()
+            packed = connection.execute(
+                select(func.count()).select_from(t).where(func.substr(c, 1, 2) == textcompression.COMPRESSED)
+            ).scalar()
+            print(f"{name:<24} {str(textcompression.enabled(name)):>8} {rows:>10,} {packed:>11,} {stored:>14,}")
+
+
+def train(args):
+    samples = []
+    with engine.connect() as connection:
+        for name in args.columns:
+            t, c = raw_table(name)
+            rows = connection.execute(select(c).where(c.isnot(None)).order_by(t.c.id.desc()).limit(args.samples))
+            samples.extend(textcompression.decode(value) for value, in rows)
+    if not samples:
+        sys.exit("No rows to train on")
+    path = textcompression.train_dictionary(samples, args.size)
+    print(f"Trained on {len(samples):,} rows, saved {path}")
+
+
+def rewrite(args, compress: bool):
+    name = args.column
+    if textcompression.enabled(name) != compress:
+        print(f"Warning: {name} is {'not ' if compress else ''}listed in COMPRESSED_TEXT_COLUMNS, "
+              f"so the API will keep writing it {'plain' if compress else 'compressed'}")
+    t, c = raw_table(name)
+    update = (
+        t.update()
+        .where(t.c.id == bindparam("row_id"), t.c.version == bindparam("row_version"))
+        .values({c.name: bindparam("stored")})
+    )
+
+    last_id, seen, changed, skipped, before, after = args.start_id, 0, 0, 0, 0, 0
+    started = time.perf_counter()
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(t.c.id, t.c.version, c).where(t.c.id > last_id).order_by(t.c.id).limit(args.batch)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for row_id, version, stored in rows:
+                target = textcompression.encode(textcompression.decode(stored), compress)
+                if target != stored:
+                    params.append({"row_id": row_id, "row_version": version, "stored": target})
+                    before += len(stored)
+                    after += len(target)
+            if params:
+                result = connection.execute(update, params)
+                if result.supports_sane_multi_rowcount():
+                    changed += result.rowcount
+                    skipped += len(params) - result.rowcount
+                else:
+                    changed += len(params)
+        seen += len(rows)
+        last_id = rows[-1][0]
+        print(f"\r{name}: {seen:,} rows, {changed:,} rewritten, {skipped:,} skipped, up to id {last_id}", end="", flush=True)
+        time.sleep(args.pause)
+    print()
+    if before:
+        print(f"{before:,} -> {after:,} bytes ({after / before:.1%}) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="compress_text.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status")
+
+    train_parser = commands.add_parser("train")
+    train_parser.add_argument("columns", nargs="+", choices=sorted(compressed_columns()))
+    train_parser.add_argument("--samples", type=int, default=5000, help="newest rows per column")
+    train_parser.add_argument("--size", type=int, default=112640, help="dictionary size in bytes")
+
+    for command in ("compress", "decompress"):
+        rewrite_parser = commands.add_parser(command)
+        rewrite_parser.add_argument("column", choices=sorted(compressed_columns()))
+        rewrite_parser.add_argument("--batch", type=int, default=500)
+        rewrite_parser.add_argument("--pause", type=float, default=0.05, help="seconds between batches")
+        rewrite_parser.add_argument("--start-id", type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == "status":
+        status(args)
+    elif args.command == "train":
+        train(args)
+    else:
+        rewrite(args, args.command == "compress")
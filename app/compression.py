@@ -0,0 +1,265 @@
+import os
+import time
+import zlib
+import anyio
+from importlib.util import find_spec
+from collections import deque
+from starlette.datastructures import Headers, MutableHeaders
+
+###############################################################################
+## Response compression
+#
+# CompressionMiddleware compresses responses with zstd, brotli or gzip,
+# whichever the client accepts first in that order. Only responses of an
+# allowed media type and at least COMPRESSION_MIN_SIZE bytes are compressed;
+# responses that already have a Content-Encoding (precompressed static files,
+# the gzip export), server-sent events and requests under exclude_paths (the
+# static mount, which has its own precompressed copies) pass through untouched. Streamed
+# bodies are compressed chunk by chunk and flushed, so clients still see each
+# chunk as soon as it is produced.
+#
+# Chunks under COMPRESSION_THREAD_MIN_SIZE are compressed on the event loop,
+# larger ones in a worker thread so they do not stall other requests. The CPU
+# time it takes is measured, and once it exceeds COMPRESSION_CPU_BUDGET (a
+# fraction of one core over the last few seconds) new responses are sent
+# uncompressed until it drops again.
+
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_MEDIA_TYPES = [t.strip() for t in os.environ.get(
+    "COMPRESSION_MEDIA_TYPES",
+    "application/json,application/vnd.chatoffside.columns+json,application/x-ndjson,"
+    "text/html,text/plain,text/css,text/csv,application/javascript,image/svg+xml",
+).split(",") if t.strip()]
+COMPRESSION_CPU_BUDGET = float(os.environ.get("COMPRESSION_CPU_BUDGET", 0.5))
+COMPRESSION_CPU_WINDOW = 5.0
+COMPRESSION_THREAD_MIN_SIZE = int(os.environ.get("COMPRESSION_THREAD_MIN_SIZE", 64 * 1024))
+
+NEVER = ("text/event-stream",)
+
+
+class _Gzip:
+    def __init__(self):
+        self.z = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes):
+        return self.z.compress(data)
+
+    def flush(self):
+        return self.z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.z.flush()
+
+
+class _Zstd:
+    def __init__(self):
+        import zstandard
+        self.flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self.z = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes):
+        return self.z.compress(data)
+
+    def flush(self):
+        return self.z.flush(self.flush_block)
+
+    def finish(self):
+        return self.z.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        import brotli
+        self.z = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes):
+        return self.z.process(data)
+
+    def flush(self):
+        return self.z.flush()
+
+    def finish(self):
+        return self.z.finish()
+
+
+def _available(module: str | None):
+    # find_spec only locates the package; it is imported with the first compressor.
+    return module is None or find_spec(module) is not None
+
+
+# Preferred first, with the optional package each one needs.
+COMPRESSORS = {"zstd": _Zstd, "br": _Brotli, "gzip": _Gzip}
+ENCODINGS = [e for e, m in [("zstd", "zstandard"), ("br", "brotli"), ("gzip", None)] if _available(m)]
+
+
+def accepted_encodings(header: str | None):
+    """Content codings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for item in (header or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    if "*" in accepted:
+        accepted.update(COMPRESSORS)
+    return accepted
+
+
+class CpuBudget:
+    """CPU seconds spent compressing, as a share of wall time over a window."""
+
+    def __init__(self, fraction: float, window: float):
+        self.fraction = fraction
+        self.window = window
+        self.spent = deque()
+        self.total = 0.0
+
+    def charge(self, seconds: float):
+        self.spent.append((time.monotonic(), seconds))
+        self.total += seconds
+
+    def usage(self):
+        horizon = time.monotonic() - self.window
+        while self.spent and self.spent[0][0] < horizon:
+            self.total -= self.spent.popleft()[1]
+        return max(self.total, 0.0) / self.window
+
+    def exhausted(self):
+        return self.usage() > self.fraction
+
+
+class Stats:
+    def __init__(self):
+        self.responses = {encoding: 0 for encoding in COMPRESSORS}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.over_budget = 0
+
+
+stats = Stats()
+budget = CpuBudget(COMPRESSION_CPU_BUDGET, COMPRESSION_CPU_WINDOW)
+
+
+def status():
+    return {
+        "encodings": ENCODINGS,
+        "responses": stats.responses,
+        "bytes_in": stats.bytes_in,
+        "bytes_out": stats.bytes_out,
+        "ratio": round(stats.bytes_out / stats.bytes_in, 3) if stats.bytes_in else None,
+        "skipped_over_budget": stats.over_budget,
+        "cpu_usage": round(budget.usage(), 3),
+        "cpu_budget": budget.fraction,
+    }
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, media_types=COMPRESSION_MEDIA_TYPES,
+                 exclude_paths=()):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.media_types = set(media_types)
+        self.exclude_paths = tuple(exclude_paths)
+
+    def excluded(self, path: str):
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in self.exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or self.excluded(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding"))
+        encoding = next((e for e in ENCODINGS if e in accepted), None)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await Responder(self, encoding, send).run(scope, receive)
+
+
+class Responder:
+    def __init__(self, middleware, encoding: str, send):
+        self.app = middleware.app
+        self.minimum_size = middleware.minimum_size
+        self.media_types = middleware.media_types
+        self.encoding = encoding
+        self.send = send
+        self.start = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def run(self, scope, receive):
+        await self.app(scope, receive, self.handle)
+
+    def eligible(self, headers: Headers):
+        if "content-encoding" in headers or self.start["status"] < 200 or self.start["status"] in (204, 304):
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return media_type not in NEVER and media_type in self.media_types
+
+    def _compress(self, data: bytes, more_body: bool):
+        started = time.thread_time()
+        out = self.compressor.compress(data) if data else b""
+        # Flushed per chunk so streamed responses reach the client as produced.
+        out += self.compressor.flush() if more_body else self.compressor.finish()
+        return out, time.thread_time() - started
+
+    async def compress(self, data: bytes, more_body: bool):
+        if len(data) >= COMPRESSION_THREAD_MIN_SIZE:
+            out, seconds = await anyio.to_thread.run_sync(self._compress, data, more_body)
+        else:
+            out, seconds = self._compress(data, more_body)
+        budget.charge(seconds)
+        stats.bytes_in += len(data)
+        stats.bytes_out += len(out)
+        return out
+
+    async def handle(self, message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows how big the response is.
+            self.start = message
+            self.passthrough = not self.eligible(Headers(raw=message["headers"]))
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            if self.start is not None:
+                await self.send(self.start)
+                self.start = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.handle(message)
+                return
+            if budget.exhausted():
+                stats.over_budget += 1
+                self.passthrough = True
+                await self.handle(message)
+                return
+            self.compressor = COMPRESSORS[self.encoding]()
+            stats.responses[self.encoding] += 1
+            body = await self.compress(body, more_body)
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers and not headers["etag"].startswith("W/"):
+                # Same content, different bytes: the validator is only weak now.
+                headers["ETag"] = "W/" + headers["etag"]
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self.send(self.start)
+            self.start = None
+        else:
+            body = await self.compress(body, more_body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,121 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response, status
+from sqlalchemy import select
+import formats
+import models
+import pagination
+import relations
+
+###############################################################################
+## Conditional GET
+#
+# Read routes first run a cheap query that selects only ids, versions and
+# updated_at timestamps (never bodies) for exactly the rows the response
+# would contain. The strong ETag is a digest of those values plus the query
+# string and the negotiated list format, so it changes whenever the
+# representation can change. A matching If-None-Match (or a fresh
+# If-Modified-Since) is answered with 304 before the full rows are loaded or
+# serialized.
+#
+# Collections (lists, and items embedding a list) get no Last-Modified:
+# deleting or unlinking a row does not advance max(updated_at) over the rows
+# left, so If-Modified-Since would keep a stale list. Their ETag does change.
+
+
+def validators(request: Request, rows):
+    """ETag and Last-Modified for the version rows backing a response."""
+    values = [tuple(row) for row in rows]
+    digest = hashlib.sha256(repr((request.url.query, formats.negotiate(request), values)).encode()).hexdigest()
+    timestamps = [v for row in values for v in row if isinstance(v, datetime)]
+    return f'"{digest[:32]}"', max(timestamps) if timestamps else None
+
+
+def _http_date(value: datetime):
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: CompressionMiddleware marks the ETags it compresses W/.
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+def set_headers(response: Response, etag: str, last_modified: datetime | None):
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = _http_date(last_modified)
+
+
+def check(request: Request, response: Response, rows, collection: bool = False):
+    """
+    Compute validators for rows and set them on response. Returns a 304
+    response if the client's copy is current, else None.
+    """
+    etag, last_modified = validators(request, rows)
+    if collection:
+        last_modified = None
+    if is_not_modified(request, etag, last_modified):
+        not_modified = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+        set_headers(not_modified, etag, last_modified)
+        if "vary" in response.headers:
+            not_modified.headers["Vary"] = response.headers["vary"]
+        return not_modified
+    set_headers(response, etag, last_modified)
+    return None
+
+###############################################################################
+## Version queries
+#
+# Each mirrors the row selection of one read route. They take a sync Session;
+# the async routers call them through AsyncSession.run_sync.
+
+
+def list_versions(session, model, where, cursor, offset, limit):
+    statement = select(model.id, model.version, model.updated_at)
+    if where is not None:
+        statement = statement.where(where)
+    statement = pagination.keyset(statement, model.id, cursor).offset(offset).limit(limit + 1)
+    return session.execute(statement).all()
+
+
+def entity_versions(session, model, entity_id, include=()):
+    """Version of one row, plus its author's when the author is embedded."""
+    if "author" in include:
+        statement = select(model.version, model.updated_at, models.User.id, models.User.version, models.User.updated_at) \
+            .outerjoin(models.User, models.User.id == model.author_id)
+    else:
+        statement = select(model.version, model.updated_at)
+    return session.execute(statement.where(model.id == entity_id)).all()
+
+
+def profession_list_versions(session, cursor, offset, limit, users_limit):
+    # each profession embeds its first users_limit users
+    rows = list_versions(session, models.Profession, None, cursor, offset, limit)
+    ids = [row.id for row in rows]
+    if ids:
+        rows += session.execute(
+            relations.profession_users_pages(ids, users_limit, models.User.id, models.User.version, models.User.updated_at)
+        ).all()
+    return rows
+
+
+def profession_versions(session, profession_id, include, limit, cursor):
+    rows = entity_versions(session, models.Profession, profession_id)
+    if rows and "users" in include:
+        statement = relations.profession_users(profession_id, models.User.id, models.User.version, models.User.updated_at)
+        rows += session.execute(pagination.keyset(statement, models.User.id, cursor).limit(limit + 1)).all()
+    return rows
@@ -0,0 +1,212 @@
+"""
+Historical currency rates.
+
+    cd app
+    python currency_history.py ingest old/currency-2024-*.json
+    python currency_history.py status
+
+Every rate snapshot the app loads is appended to a per-currency time series,
+so history survives currency.json being overwritten. The ingest command loads
+older snapshot files; ingesting one twice is a no-op.
+"""
+import os, sys
+import argparse
+import fcntl
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import currency_rates
+
+CURRENCY_HISTORY_DIR = os.environ.get(
+    "CURRENCY_HISTORY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "currency_history")
+)
+
+###############################################################################
+## Store
+#
+# Each currency has one segment file per year, <dir>/<CODE>/<year>.bin: a
+# packed array of (timestamp, rate) records, int64 Unix seconds and float64
+# rate against USD, sorted by timestamp. Segments are read through np.memmap,
+# so a query touches only the pages it needs: a range query is two binary
+# searches per year plus a slice, and downsampling is a few vectorized passes
+# over that slice.
+#
+# Writers (every API worker and the CLI) take an exclusive flock on
+# <dir>/.lock for the whole ingest, so a snapshot is checked and appended by
+# one process at a time and never recorded twice. Readers take no lock:
+# appends only grow a segment and backfills replace it with a rename.
+
+RECORD = np.dtype([("t", "<i8"), ("v", "<f8")])
+INTERVALS = {"raw": None, "daily": 86400, "weekly": 7 * 86400}
+# 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday.
+WEEK_OFFSET = 3 * 86400
+
+
+def epoch(value: datetime):
+    return int((value - datetime(1970, 1, 1)).total_seconds())
+
+
+def from_epoch(seconds: int):
+    return datetime(1970, 1, 1) + timedelta(seconds=int(seconds))
+
+
+class HistoryStore:
+    def __init__(self, directory: str = CURRENCY_HISTORY_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self._maps = {}
+
+    def _path(self, code: str, year: int):
+        return os.path.join(self.directory, code, f"{year}.bin")
+
+    def years(self, code: str):
+        try:
+            names = os.listdir(os.path.join(self.directory, code))
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[:-4]) for name in names if name.endswith(".bin") and name[:-4].isdigit())
+
+    def codes(self):
+        try:
+            return sorted(name for name in os.listdir(self.directory) if not name.startswith(".") and self.years(name))
+        except FileNotFoundError:
+            return []
+
+    def segment(self, code: str, year: int):
+        """Records of one currency-year, memory-mapped; empty if there are none."""
+        path = self._path(code, year)
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=RECORD)
+        if size < RECORD.itemsize:
+            return np.empty(0, dtype=RECORD)
+        cached = self._maps.get(path)
+        # Appends grow the file; a map of the old size is replaced.
+        if cached is None or cached[0] != size:
+            cached = (size, np.memmap(path, dtype=RECORD, mode="r", shape=(size // RECORD.itemsize,)))
+            self._maps[path] = cached
+        return cached[1]
+
+    ###########################################################################
+    ## Writing
+
+    def ingest(self, snapshot):
+        """Append a snapshot's rates; returns how many currencies were new at its time."""
+        t = epoch(snapshot.last_updated_at)
+        year = snapshot.last_updated_at.year
+        added = 0
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock, open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            for code, value in snapshot.rates.items():
+                if self._add(code, year, t, value):
+                    added += 1
+        return added
+
+    def _add(self, code, year, t, value):
+        path = self._path(code, year)
+        records = self.segment(code, year)
+        record = np.array([(t, value)], dtype=RECORD)
+        if len(records) == 0 or records["t"][-1] < t:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "ab") as f:
+                f.write(record.tobytes())
+            return True
+        position = int(np.searchsorted(records["t"], t))
+        if position < len(records) and records["t"][position] == t:
+            return False
+        # An older snapshot (backfill): rewrite the segment with it in place.
+        merged = np.concatenate([records[:position], record, records[position:]])
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f"{year}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(merged.tobytes())
+            self._maps.pop(path, None)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return True
+
+    ###########################################################################
+    ## Queries
+
+    def rate_at(self, code: str, when: datetime):
+        """The last (timestamp, rate) recorded at or before when, or None."""
+        t = epoch(when)
+        for year in reversed([y for y in self.years(code) if y <= when.year]):
+            records = self.segment(code, year)
+            position = int(np.searchsorted(records["t"], t, side="right"))
+            if position:
+                record = records[position - 1]
+                return from_epoch(record["t"]), float(record["v"])
+        return None
+
+    def range(self, code: str, start: datetime, end: datetime, interval: str = "raw"):
+        """
+        Timestamps and rates between start and end (inclusive). With daily or
+        weekly, one point per day or week: its last rate, stamped with the
+        start of the day or week.
+        """
+        t0, t1 = epoch(start), epoch(end)
+        parts = []
+        for year in self.years(code):
+            if start.year <= year <= end.year:
+                records = self.segment(code, year)
+                times = records["t"]
+                lo = int(np.searchsorted(times, t0, side="left"))
+                hi = int(np.searchsorted(times, t1, side="right"))
+                if hi > lo:
+                    parts.append(records[lo:hi])
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+        times, values = np.ascontiguousarray(records["t"]), np.ascontiguousarray(records["v"])
+        step = INTERVALS[interval]
+        if step is None or len(times) == 0:
+            return times, values
+        offset = WEEK_OFFSET if interval == "weekly" else 0
+        buckets = (times + offset) // step
+        last = np.append(np.flatnonzero(np.diff(buckets)), len(buckets) - 1)
+        return buckets[last] * step - offset, values[last]
+
+
+store = HistoryStore()
+
+
+###############################################################################
+## CLI
+
+def ingest_files(paths):
+    for path in paths:
+        try:
+            snapshot = currency_rates.read_snapshot(path)
+        except currency_rates.SnapshotError as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            continue
+        added = store.ingest(snapshot)
+        print(f"{path}: {snapshot.meta['last_updated_at']}, {added} of {len(snapshot.rates)} rates added")
+
+
+def print_status():
+    for code in store.codes():
+        count = sum(len(store.segment(code, year)) for year in store.years(code))
+        first = store.segment(code, store.years(code)[0])["t"][0]
+        last = store.segment(code, store.years(code)[-1])["t"][-1]
+        print(f"{code:<8} {count:>10,} rates  {from_epoch(first).isoformat()} .. {from_epoch(last).isoformat()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="currency_history.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="add snapshot files (currency.json format) to history")
+    ingest.add_argument("files", nargs="+")
+    commands.add_parser("status", help="records and time span per currency")
+    args = parser.parse_args()
+    if args.command == "ingest":
+        ingest_files(args.files)
+    else:
+        print_status()
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+CURRENCY_FILE = os.environ.get(
+    "CURRENCY_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "router", "currency.json")
+)
+CURRENCY_STAT_INTERVAL = float(os.environ.get("CURRENCY_STAT_INTERVAL", 1))
+CURRENCY_BATCH_MAX = int(os.environ.get("CURRENCY_BATCH_MAX", 100000))
+
+###############################################################################
+## Rate snapshots
+#
+# The rates file is parsed once into an immutable Snapshot that also holds
+# the response body already serialized, so GET /currencyapi/latest only sends
+# bytes. At most every CURRENCY_STAT_INTERVAL seconds a request stats the
+# file; when its mtime or size changed, a new Snapshot is built and swapped in
+# with a single assignment. Requests holding the old one finish with it, and
+# a file that fails to parse (e.g. caught mid-write) keeps the old snapshot
+# in service.
+#
+# Each snapshot also carries the full cross-rate matrix, cross[i, j] being the
+# price of one codes[i] in codes[j], so a batch of conversions is one fancy
+# index and one multiplication. It is built on first use, and numpy only
+# imported then, so /latest and app startup never pay for it.
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class UnknownCurrency(ValueError):
+    def __init__(self, codes):
+        self.codes = sorted(set(codes))
+        super().__init__(f"Unknown currencies {', '.join(self.codes)}")
+
+
+class Snapshot:
+    __slots__ = ("meta", "data", "rates", "last_updated_at", "body", "etag", "source", "codes", "index", "_cross")
+
+    def __init__(self, document: dict, source=None):
+        try:
+            last_updated_at = document["meta"]["last_updated_at"]
+            data = document["data"]
+            rates = {code: float(entry["value"]) for code, entry in data.items()}
+            updated = datetime.fromisoformat(last_updated_at.replace("Z", "+00:00")).replace(tzinfo=None)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise SnapshotError(f"Malformed currency data: {e!r}")
+        invalid = [code for code, value in rates.items() if not value > 0 or value == float("inf")]
+        if invalid:
+            raise SnapshotError(f"Malformed currency data: non-positive rates for {', '.join(invalid)}")
+        self.meta = MappingProxyType(dict(document["meta"]))
+        self.data = MappingProxyType({code: MappingProxyType(dict(entry)) for code, entry in data.items()})
+        self.rates = MappingProxyType(rates)
+        self.last_updated_at = updated
+        self.body = orjson.dumps(document)
+        self.etag = f'"{hashlib.sha256(last_updated_at.encode()).hexdigest()[:32]}"'
+        self.source = source
+        self.codes = tuple(rates)
+        self.index = MappingProxyType({code: i for i, code in enumerate(self.codes)})
+        self._cross = None
+
+    @property
+    def cross(self):
+        if self._cross is None:
+            import numpy as np
+            values = np.fromiter(self.rates.values(), dtype=np.float64, count=len(self.rates))
+            cross = values[np.newaxis, :] / values[:, np.newaxis]
+            cross.setflags(write=False)
+            # Racing requests may both build it; either result is the same.
+            self._cross = cross
+        return self._cross
+
+    def positions(self, codes):
+        """Matrix indices of codes, as an array."""
+        import numpy as np
+        index = self.index
+        try:
+            return np.fromiter((index[code] for code in codes), dtype=np.intp, count=len(codes))
+        except KeyError:
+            raise UnknownCurrency([code for code in codes if code not in index])
+
+    def convert(self, bases, targets, amounts):
+        """Rates and converted amounts; each argument has n items or one."""
+        import numpy as np
+        rates = self.cross[self.positions(bases), self.positions(targets)]
+        return rates, rates * np.asarray(amounts, dtype=np.float64)
+
+    def table(self, bases, targets):
+        import numpy as np
+        return self.cross[np.ix_(self.positions(bases), self.positions(targets))]
+
+
+def _file_key(path: str):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_snapshot(path: str):
+    try:
+        key = _file_key(path)
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        raise SnapshotError("Currency data file not found")
+    try:
+        document = json.loads(raw)
+    except ValueError as e:
+        raise SnapshotError(f"Error parsing currency data file: {e}")
+    return Snapshot(document, source=key)
+
+
+class RateCache:
+    def __init__(self, path: str = CURRENCY_FILE, interval: float = CURRENCY_STAT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.snapshot = None
+        self.rejected = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        # Called with every snapshot swapped in.
+        self.listeners = [_record_history]
+
+    def current(self):
+        """The live snapshot, reloaded first if the file changed."""
+        now = time.monotonic()
+        if self.snapshot is None or now - self.checked_at >= self.interval:
+            self.checked_at = now
+            self.reload_if_changed()
+        if self.snapshot is None:
+            raise SnapshotError(f"No currency data in {self.path}")
+        return self.snapshot
+
+    def reload_if_changed(self):
+        try:
+            key = _file_key(self.path)
+        except FileNotFoundError:
+            if self.snapshot is None:
+                raise SnapshotError("Currency data file not found")
+            return
+        if self.snapshot is not None and key in (self.snapshot.source, self.rejected):
+            return
+        # One reload at a time; the others keep serving the old snapshot.
+        if not self.lock.acquire(blocking=self.snapshot is None):
+            return
+        try:
+            snapshot = read_snapshot(self.path)
+            if self.snapshot is None or self.snapshot.source != snapshot.source:
+                self.swap(snapshot)
+        except SnapshotError as e:
+            if self.snapshot is None:
+                raise
+            # Not retried until the file changes again.
+            self.rejected = key
+            logger.warning(f"{e}; keeping currency data of {self.snapshot.meta['last_updated_at']}")
+        finally:
+            self.lock.release()
+
+    def publish(self, document: dict):
+        """
+        Make document the current data: validate it, replace the file (so
+        other workers and restarts see it too) and swap it in. Returns the
+        new snapshot; raises SnapshotError and changes nothing if invalid.
+        """
+        snapshot = Snapshot(document)
+        with self.lock:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(document, f, indent=4)
+                os.chmod(tmp, 0o644)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            snapshot.source = _file_key(self.path)
+            self.swap(snapshot)
+        return snapshot
+
+    def swap(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        logger.info(f"Currency data of {snapshot.meta['last_updated_at']} loaded ({len(snapshot.rates)} rates)")
+        for listener in self.listeners:
+            try:
+                listener(snapshot)
+            except Exception:
+                logger.exception(f"Currency snapshot listener {listener.__qualname__} failed")
+
+
+def _record_history(snapshot: Snapshot):
+    # Every snapshot the app loads (from the file or a refresh) goes into
+    # history. Ingest writes a file per currency and imports currency_history
+    # and numpy the first time, so it runs in a thread of its own instead of
+    # holding up the request that loaded the snapshot.
+    threading.Thread(target=_ingest_history, args=(snapshot,), name="currency-history", daemon=True).start()
+
+
+def _ingest_history(snapshot: Snapshot):
+    try:
+        import currency_history
+        currency_history.store.ingest(snapshot)
+    except Exception:
+        logger.exception(f"Recording currency data of {snapshot.meta['last_updated_at']} in history failed")
+
+
+rates = RateCache()
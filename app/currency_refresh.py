@@ -0,0 +1,258 @@
+"""
+Scheduled refresh of the currency rates.
+
+With CURRENCY_PROVIDER set, the app fetches a new snapshot every
+CURRENCY_REFRESH_INTERVAL seconds in a background thread and publishes it to
+CURRENCY_FILE, where every worker picks it up. Only one worker on the host
+refreshes: the one holding a flock on CURRENCY_REFRESH_LOCK; the others
+check once a minute whether it has gone away.
+
+    CURRENCY_PROVIDER=file:/srv/rates/latest.json     a file another job writes
+    CURRENCY_PROVIDER=http://localhost:8765/latest    any URL serving currency.json's format
+    CURRENCY_PROVIDER=mypackage.rates:Provider        your own class (see Provider)
+
+For offline testing, serve a stand-in whose rates drift on every request:
+
+    cd app
+    python currency_refresh.py serve --port 8765
+    python currency_refresh.py fetch http://localhost:8765/latest
+"""
+import os, sys
+import argparse
+import fcntl
+import importlib
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import currency_rates
+
+logger = logging.getLogger(__name__)
+
+CURRENCY_PROVIDER = os.environ.get("CURRENCY_PROVIDER")
+CURRENCY_REFRESH_INTERVAL = float(os.environ.get("CURRENCY_REFRESH_INTERVAL", 3600))
+CURRENCY_REFRESH_TIMEOUT = float(os.environ.get("CURRENCY_REFRESH_TIMEOUT", 10))
+CURRENCY_REFRESH_MAX_BACKOFF = float(os.environ.get("CURRENCY_REFRESH_MAX_BACKOFF", 900))
+CURRENCY_REFRESH_LOCK = os.environ.get("CURRENCY_REFRESH_LOCK", currency_rates.CURRENCY_FILE + ".lock")
+LEADER_CHECK_INTERVAL = 60
+
+###############################################################################
+## Providers
+#
+# A provider has one method, fetch(), returning a document in currency.json's
+# format: {"meta": {"last_updated_at": ...}, "data": {code: {"code", "value"}}}
+# with values per US dollar. It raises on any failure; the refresher retries.
+
+
+class Provider:
+    def fetch(self) -> dict:
+        raise NotImplementedError
+
+
+class FileProvider(Provider):
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self):
+        with open(self.path, "rb") as f:
+            return json.loads(f.read())
+
+    def __repr__(self):
+        return f"FileProvider({self.path!r})"
+
+
+class HttpProvider(Provider):
+    def __init__(self, url: str, timeout: float = CURRENCY_REFRESH_TIMEOUT, headers: dict | None = None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or {}
+
+    def fetch(self):
+        import httpx
+        response = httpx.get(self.url, timeout=self.timeout, headers=self.headers)
+        response.raise_for_status()
+        return response.json()
+
+    def __repr__(self):
+        return f"HttpProvider({self.url!r})"
+
+
+def provider_from_setting(setting: str):
+    """A Provider from a CURRENCY_PROVIDER value."""
+    if setting.startswith("file:"):
+        return FileProvider(setting[len("file:"):])
+    if setting.startswith(("http://", "https://")):
+        return HttpProvider(setting)
+    module, _, name = setting.partition(":")
+    if not name:
+        raise ValueError(f"CURRENCY_PROVIDER {setting!r}: expected file:PATH, a URL or module:Class")
+    return getattr(importlib.import_module(module), name)()
+
+
+###############################################################################
+## Refresher
+
+
+def validate(snapshot, current):
+    """Reject snapshots that would move the data backwards or lose currencies."""
+    if snapshot.rates.get("USD") != 1:
+        raise currency_rates.SnapshotError("Rates must be per US dollar (USD = 1)")
+    if current is None:
+        return
+    if snapshot.last_updated_at < current.last_updated_at:
+        raise currency_rates.SnapshotError(
+            f"Snapshot of {snapshot.meta['last_updated_at']} is older than the current {current.meta['last_updated_at']}"
+        )
+    missing = set(current.rates) - set(snapshot.rates)
+    if len(missing) > len(current.rates) // 10:
+        raise currency_rates.SnapshotError(f"Snapshot is missing {len(missing)} currencies, e.g. {', '.join(sorted(missing)[:5])}")
+
+
+class CurrencyRefresher:
+    def __init__(self, provider: Provider, cache, interval: float, max_backoff: float = CURRENCY_REFRESH_MAX_BACKOFF,
+                 lock_path: str = CURRENCY_REFRESH_LOCK):
+        self.provider = provider
+        self.cache = cache
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.lock_path = lock_path
+        self.lock_file = None
+        self.failures = 0
+        self.last_success = None
+        self.last_error = None
+        self.next_run = None
+        self.stop = threading.Event()
+
+    def run_once(self):
+        """Fetch, validate and publish one snapshot. Returns True if the data changed."""
+        document = self.provider.fetch()
+        snapshot = currency_rates.Snapshot(document)
+        try:
+            current = self.cache.current()
+        except currency_rates.SnapshotError:
+            current = None
+        validate(snapshot, current)
+        if current is not None and snapshot.meta["last_updated_at"] == current.meta["last_updated_at"]:
+            return False
+        self.cache.publish(document)
+        return True
+
+    def leader(self):
+        """Whether this process holds the refresh lock, taking it if it is free."""
+        if self.lock_file is None:
+            lock_file = open(self.lock_path, "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                return False
+            # Held, with the file open, for the life of the process.
+            self.lock_file = lock_file
+        return True
+
+    def delay(self):
+        """Seconds until the next attempt: the interval, or jittered exponential backoff after failures."""
+        if not self.failures:
+            return self.interval * random.uniform(0.9, 1.1)
+        backoff = min(self.max_backoff, self.interval, 5 * 2 ** (self.failures - 1))
+        return random.uniform(backoff / 2, backoff)
+
+    def status(self):
+        return {
+            "provider": repr(self.provider),
+            "interval": self.interval,
+            "failures": self.failures,
+            "last_success": self.last_success,
+            "last_error": self.last_error,
+            "next_run": self.next_run,
+            "leader": self.lock_file is not None,
+        }
+
+    def start(self):
+        def run():
+            while not self.stop.is_set():
+                try:
+                    if not self.leader():
+                        self.stop.wait(min(self.interval, LEADER_CHECK_INTERVAL))
+                        continue
+                    changed = self.run_once()
+                    self.failures = 0
+                    self.last_success = datetime.utcnow()
+                    if changed:
+                        logger.info(f"Currency rates refreshed from {self.provider!r}")
+                except Exception as e:
+                    self.failures += 1
+                    self.last_error = f"{datetime.utcnow().isoformat()}: {e!r}"
+                    logger.warning(f"Currency refresh from {self.provider!r} failed ({self.failures} in a row): {e!r}")
+                delay = self.delay()
+                self.next_run = datetime.utcfromtimestamp(time.time() + delay)
+                self.stop.wait(delay)
+
+        threading.Thread(target=run, name="currency-refresh", daemon=True).start()
+
+
+refresher = (
+    CurrencyRefresher(provider_from_setting(CURRENCY_PROVIDER), currency_rates.rates, CURRENCY_REFRESH_INTERVAL)
+    if CURRENCY_PROVIDER else None
+)
+
+
+###############################################################################
+## Local stand-in provider
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Serves currency.json with every rate nudged by a random walk and a fresh timestamp."""
+
+    document = None
+    volatility = 0.002
+
+    def do_GET(self):
+        document = StandIn.document
+        for code, entry in document["data"].items():
+            if code != "USD":
+                entry["value"] *= 1 + random.gauss(0, self.volatility)
+        document["meta"]["last_updated_at"] = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        body = json.dumps(document).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, path: str):
+    with open(path) as f:
+        StandIn.document = json.load(f)
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandIn)
+    print(f"Serving drifting rates from {path} at http://127.0.0.1:{port}/latest", file=sys.stderr)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="currency_refresh.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stand_in = commands.add_parser("serve", help="run the local stand-in provider")
+    stand_in.add_argument("--port", type=int, default=8765)
+    stand_in.add_argument("--file", default=currency_rates.CURRENCY_FILE, help="snapshot to start from")
+    fetch = commands.add_parser("fetch", help="fetch and publish one snapshot now")
+    fetch.add_argument("provider", nargs="?", default=CURRENCY_PROVIDER, help="as in CURRENCY_PROVIDER")
+    args = parser.parse_args()
+    if args.command == "serve":
+        serve(args.port, args.file)
+    else:
+        if not args.provider:
+            sys.exit("Give a provider or set CURRENCY_PROVIDER")
+        refresher = CurrencyRefresher(provider_from_setting(args.provider), currency_rates.rates, 0)
+        try:
+            changed = refresher.run_once()
+        except Exception as e:
+            sys.exit(f"Refresh failed: {e!r}")
+        print(f"{currency_rates.rates.current().meta['last_updated_at']}: {'published' if changed else 'unchanged'}")
@@ -4,8 +4,13 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from sqlmodel import Field, Relationship, Session, SQLModel, create_engine, select
 import logging
+from starlette.requests import Request
+import dbpool
+import replicas
+import deletion
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,18 +20,25 @@ logger = logging.getLogger(__name__)
 dotenv_path = join(dirname(__file__), '.env')
 load_dotenv(dotenv_path)
 
+# Checkout statistics for the server database pools, see /metrics/pool
+primary_pool_stats = dbpool.PoolStats()
+async_pool_stats = dbpool.PoolStats()
+
 # Determine environment (default to 'development' if not set)
 ENV = os.environ.get("ENV", "development")
 logger.info(f"Current environment: {ENV}")
 
 if ENV == "development":
     # Use SQLite for local development
-    SQLALCHEMY_SQLITE_URL = "sqlite:///./blog.db"
+    SQLITE_PATH = os.environ.get("SQLITE_PATH", "./blog.db")
+    SQLALCHEMY_SQLITE_URL = f"sqlite:///{SQLITE_PATH}"
+    SQLALCHEMY_ASYNC_URL = f"sqlite+aiosqlite:///{SQLITE_PATH}"
     logger.info(f"Using SQLite database at: {SQLALCHEMY_SQLITE_URL}")
     # Create engine with SQLite-specific arguments
     engine = create_engine(
         SQLALCHEMY_SQLITE_URL, connect_args={"check_same_thread": False}
     )
+    dbpool.register("primary", engine)
 else:
     # Use PostgreSQL for production
     POSTGRES_USERNAME = os.environ.get("POSTGRES_USERNAME")
@@ -39,25 +51,108 @@ else:
     
     # Actual connection URL with real password
     SQLALCHEMY_DATABASE_URL = f"postgresql://{POSTGRES_USERNAME}:{os.environ.get('POSTGRES_PASSWORD')}@{POSTGRES_HOSTNAME}:{POSTGRES_PORT}/{POSTGRES_DATABASE}"
+    SQLALCHEMY_ASYNC_URL = f"postgresql+asyncpg://{POSTGRES_USERNAME}:{os.environ.get('POSTGRES_PASSWORD')}@{POSTGRES_HOSTNAME}:{POSTGRES_PORT}/{POSTGRES_DATABASE}"
     engine = create_engine(
-        SQLALCHEMY_DATABASE_URL
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=dbpool.instrumented(QueuePool, primary_pool_stats),
+        **dbpool.pool_options()
     )
+    dbpool.register("primary", engine, primary_pool_stats)
+
+# DATABASE_ASYNC=true serves the CRUD routers from router/aio on an asyncio
+# engine (aiosqlite in development, asyncpg in production). The sync engine
+# above is always created: sqladmin and the scripts use it.
+ASYNC_DB = os.environ.get("DATABASE_ASYNC", "false").lower() == "true"
+async_engine = None
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    logger.info("Async database sessions enabled")
+    if ENV == "development":
+        async_engine = create_async_engine(SQLALCHEMY_ASYNC_URL)
+        dbpool.register("async", async_engine)
+    else:
+        async_engine = create_async_engine(
+            SQLALCHEMY_ASYNC_URL,
+            poolclass=dbpool.instrumented(AsyncAdaptedQueuePool, async_pool_stats),
+            **dbpool.pool_options()
+        )
+        dbpool.register("async", async_engine, async_pool_stats)
+
+# Optional read replicas (production only): DB_REPLICA_HOSTS=host[:port],...
+# They share the primary's credentials and database name. GET requests use
+# them round robin; see replicas.py for health checks and read-your-writes.
+REPLICA_HOSTS = [h.strip() for h in os.environ.get("DB_REPLICA_HOSTS", "").split(",") if h.strip()]
+replica_engines, async_replica_engines = [], []
+if ENV != "development":
+    for index, host in enumerate(REPLICA_HOSTS):
+        hostname, _, port = host.partition(":")
+        credentials = f"{POSTGRES_USERNAME}:{os.environ.get('POSTGRES_PASSWORD')}@{hostname}:{port or 5432}/{POSTGRES_DATABASE}"
+        logger.info(f"Using PostgreSQL read replica at: postgresql://{POSTGRES_USERNAME}:****@{hostname}:{port or 5432}/{POSTGRES_DATABASE}")
+        stats = dbpool.PoolStats()
+        replica = create_engine(
+            f"postgresql://{credentials}",
+            poolclass=dbpool.instrumented(QueuePool, stats),
+            **dbpool.pool_options()
+        )
+        dbpool.register(f"replica{index}", replica, stats)
+        replica_engines.append((f"replica{index}", replica))
+        if ASYNC_DB:
+            stats = dbpool.PoolStats()
+            async_replica = create_async_engine(
+                f"postgresql+asyncpg://{credentials}",
+                poolclass=dbpool.instrumented(AsyncAdaptedQueuePool, stats),
+                **dbpool.pool_options()
+            )
+            dbpool.register(f"async_replica{index}", async_replica, stats)
+            async_replica_engines.append((f"async_replica{index}", async_replica))
+
+REPLICA_RETRY_AFTER = float(os.environ.get("DB_REPLICA_RETRY_AFTER", 30))
+REPLICA_HEALTH_INTERVAL = float(os.environ.get("DB_REPLICA_HEALTH_INTERVAL", 10))
+replica_set = replicas.ReplicaSet(engine, replica_engines, REPLICA_RETRY_AFTER)
+async_replica_set = replicas.ReplicaSet(async_engine, async_replica_engines, REPLICA_RETRY_AFTER)
+sticky_writes = replicas.StickyWrites(float(os.environ.get("DB_REPLICA_STICKY_SECONDS", 5)))
+
+# Removes the rows of deleted users in the background, see deletion.py
+deletion_worker = deletion.DeletionWorker(
+    engine,
+    batch=int(os.environ.get("USER_DELETE_BATCH", 1000)),
+    pause=float(os.environ.get("USER_DELETE_PAUSE", 0.05)),
+    interval=float(os.environ.get("USER_DELETE_INTERVAL", 30)),
+)
 
 def create_db_and_tables():
+    import search  # registers the full-text index DDL on the searchable tables
     logger.info("Creating database tables...")
     SQLModel.metadata.create_all(engine)
+    Base.metadata.create_all(bind=engine)
     logger.info("Database tables created successfully")
 
-def get_session():
-    with Session(engine) as session:
-        yield session
+def get_session(request: Request):
+    bind, write_key = replicas.route(request, replica_set, sticky_writes)
+    sticky_writes.mark(write_key)
+    try:
+        with Session(bind) as session:
+            yield session
+    finally:
+        # restart the read-your-writes window once the write has committed
+        sticky_writes.mark(write_key)
+
+async def get_async_session(request: Request):
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    bind, write_key = replicas.route(request, async_replica_set, sticky_writes)
+    sticky_writes.mark(write_key)
+    try:
+        # expire_on_commit=False: attribute access after commit must not trigger
+        # implicit IO, which AsyncSession cannot do.
+        async with AsyncSession(bind, expire_on_commit=False) as session:
+            yield session
+    finally:
+        sticky_writes.mark(write_key)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-Base.metadata.create_all(bind=engine)
-
 def get_db():
     db = SessionLocal()
     try:
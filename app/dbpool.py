@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+###############################################################################
+## Pool configuration
+
+def pool_options():
+    """
+    Pool settings for server databases, read from the environment.
+    Defaults keep SQLAlchemy's pool size but recycle connections before
+    typical server or load balancer idle timeouts and pre-ping on checkout.
+    """
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+###############################################################################
+## Instrumentation
+
+class PoolStats:
+    """Checkout counters and recent checkout wait times for one pool."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._recent.append(seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self):
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts = self.checkouts
+            result = {
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "wait_ms_avg": round(self.wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+            }
+        for label, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            value = recent[min(int(len(recent) * q), len(recent) - 1)] if recent else 0.0
+            result[f"wait_ms_{label}"] = round(value * 1000, 3)
+        return result
+
+
+class _TimedCheckoutMixin:
+    stats: PoolStats = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def instrumented(pool_class, stats: PoolStats):
+    """
+    Subclass of pool_class that times every checkout into stats.
+    stats is a class attribute so it survives pool.recreate() after dispose().
+    """
+    return type(f"Instrumented{pool_class.__name__}", (_TimedCheckoutMixin, pool_class), {"stats": stats})
+
+###############################################################################
+## Registry
+
+_engines = {}
+
+def register(name: str, engine, stats: PoolStats | None = None):
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if stats is not None:
+        event.listen(sync_engine, "invalidate", lambda *args: stats.record_invalidation())
+    _engines[name] = (sync_engine, stats)
+
+
+def pool_status():
+    status = {}
+    for name, (engine, stats) in _engines.items():
+        pool = engine.pool
+        entry = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        if stats is not None:
+            entry.update(stats.snapshot())
+        status[name] = entry
+    return status
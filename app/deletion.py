@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import event, exists, or_, select, update
+from sqlalchemy.orm import Session, with_loader_criteria
+import models
+
+logger = logging.getLogger(__name__)
+
+###############################################################################
+## User deletion
+#
+# DELETE /users/{id} only sets user.deleted_at and revokes the user's refresh
+# tokens. From then on every ORM query (any Session, sync or async) behaves as
+# if the user and their posts, prompts and projects were gone: login, token
+# auth and refresh fail, and reads return 404. A DeletionWorker then removes
+# the dependent rows in small batches, each in its own short transaction, and
+# finally the user row. Pending deletions are found by querying deleted_at, so
+# work left over from a restart is picked up again.
+
+AUTHORED = [models.Post, models.Prompt, models.Project]
+
+
+def _by_deleted_user(model):
+    # An alias of the Core table: the User criteria below does not apply to it,
+    # and it is not correlated away when the outer query joins User itself.
+    user = models.User.__table__.alias("deleted_user")
+    return exists().where(user.c.id == model.author_id, user.c.deleted_at.isnot(None))
+
+
+def visible(statement):
+    """statement without deleted users and their posts, prompts and projects."""
+    return statement.options(
+        with_loader_criteria(models.User, models.User.deleted_at.is_(None), include_aliases=True),
+        *[
+            # Not NOT IN: that is NULL, i.e. hidden, for rows without an author.
+            with_loader_criteria(
+                model, or_(model.author_id.is_(None), ~_by_deleted_user(model)), include_aliases=True
+            )
+            for model in AUTHORED
+        ],
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_deleted_users(orm_execute_state):
+    if orm_execute_state.is_select and not orm_execute_state.execution_options.get("include_deleted", False):
+        orm_execute_state.statement = visible(orm_execute_state.statement)
+
+
+def mark_deleted(session, user):
+    user.deleted_at = datetime.utcnow()
+    session.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.user_id == user.id, models.RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=user.deleted_at)
+    )
+
+
+def purge_user(engine, user_id: int, batch: int, pause: float = 0):
+    """Delete a marked user's rows, batch by batch, then the user. Returns rows deleted."""
+    tables = [model.__table__ for model in AUTHORED]
+    deleted = 0
+    for table, column in [(t, t.c.author_id) for t in tables] + [
+        (models.RefreshToken.__table__, models.RefreshToken.__table__.c.user_id),
+        (models.UserProfessionLink.__table__, models.UserProfessionLink.__table__.c.user_id),
+    ]:
+        key = list(table.primary_key.columns)[0]
+        while True:
+            with engine.begin() as connection:
+                ids = select(key).where(column == user_id).limit(batch).scalar_subquery()
+                count = connection.execute(table.delete().where(key.in_(ids), column == user_id)).rowcount
+            deleted += count
+            if count < batch:
+                break
+            time.sleep(pause)
+    user = models.User.__table__
+    with engine.begin() as connection:
+        deleted += connection.execute(user.delete().where(user.c.id == user_id, user.c.deleted_at.isnot(None))).rowcount
+    return deleted
+
+
+class DeletionWorker:
+    def __init__(self, engine, batch: int, pause: float, interval: float):
+        self.engine = engine
+        self.batch = batch
+        self.pause = pause
+        self.interval = interval
+        self.wake = threading.Event()
+
+    def pending(self):
+        user = models.User.__table__
+        with self.engine.connect() as connection:
+            return connection.execute(select(user.c.id).where(user.c.deleted_at.isnot(None)).order_by(user.c.deleted_at)).scalars().all()
+
+    def run_once(self):
+        for user_id in self.pending():
+            started = time.perf_counter()
+            deleted = purge_user(self.engine, user_id, self.batch, self.pause)
+            logger.info(f"Deleted user {user_id}: {deleted} rows in {time.perf_counter() - started:.1f}s")
+
+    def start(self):
+        def run():
+            while True:
+                try:
+                    self.run_once()
+                except Exception:
+                    logger.exception("User deletion failed, retrying later")
+                self.wake.wait(self.interval)
+                self.wake.clear()
+
+        threading.Thread(target=run, name="user-deletion", daemon=True).start()
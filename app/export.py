@@ -0,0 +1,48 @@
+import os, sys
+import json
+import zlib
+from datetime import datetime
+from sqlalchemy import select
+import models
+
+###############################################################################
+## NDJSON export
+#
+# Rows are read with yield_per, which turns on server-side cursors
+# (stream_results) where the driver supports them, and written out one batch
+# at a time, so memory stays flat whatever the number of rows. Core rows are
+# used instead of ORM objects: nothing is kept in the identity map.
+
+EXPORTABLE = {
+    "post": models.Post,
+    "prompt": models.Prompt,
+    "project": models.Project,
+}
+
+EXPORT_BATCH = int(os.getenv("EXPORT_BATCH", 2000))
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def ndjson(session, user_id: int, types, batch: int = EXPORT_BATCH):
+    """One JSON object per line for every row of the given types the user wrote, in id order."""
+    encode = json.JSONEncoder(default=_default, separators=(",", ":"), ensure_ascii=False).encode
+    for name in types:
+        table = EXPORTABLE[name].__table__
+        statement = select(table).where(table.c.author_id == user_id).order_by(table.c.id)
+        result = session.execute(statement, execution_options={"yield_per": batch})
+        for rows in result.mappings().partitions():
+            yield "".join(encode({"type": name, **row}) + "\n" for row in rows).encode("utf-8")
+
+
+def gzipped(chunks, level: int = 6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
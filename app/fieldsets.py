@@ -0,0 +1,33 @@
+from fastapi import HTTPException, status
+
+###############################################################################
+## Sparse fieldsets
+#
+# ?fields=id,title on a list route selects only those columns, so large TEXT
+# bodies are neither read from the database nor serialized. The route's
+# response model has every field optional and is returned with
+# response_model_exclude_unset, so omitted columns are left out of the JSON.
+
+
+def columns(model, fields: str | None, schema, every: bool = False):
+    """
+    Columns of model named in fields, always including id (the pagination
+    key). Only fields of the response schema can be asked for. None when
+    fields is not given, meaning whole rows, unless every is set: then all of
+    the schema's columns.
+    """
+    if not fields:
+        if not every:
+            return None
+        fields = ",".join(schema.__fields__)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    allowed = list(schema.__fields__)
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields {', '.join(unknown)}; choose from {', '.join(allowed)}",
+        )
+    if "id" not in names:
+        names.insert(0, "id")
+    return [getattr(model, name) for name in dict.fromkeys(names)]
@@ -0,0 +1,168 @@
+import typing
+from datetime import datetime, timezone
+from fastapi import HTTPException, Request, Response, status
+import orjson
+
+###############################################################################
+## List formats
+#
+# List routes answer Accept: application/json (the default) with one object
+# per row. Analytics clients can ask for the same page column by column
+# instead, built straight from the query's result rows without going through
+# the response model:
+#
+#   application/vnd.chatoffside.columns+json   {"id": [...], "title": [...]}
+#   application/msgpack                        the same mapping as MessagePack
+#   application/vnd.apache.arrow.stream        an Arrow IPC stream, one batch
+#   application/vnd.apache.arrow.file          the same as an Arrow IPC file
+#
+# An Accept header that allows none of these (nor JSON, nor a wildcard) gets
+# 406. MessagePack and Arrow need the msgpack and pyarrow packages; they are
+# imported on first use.
+
+JSON = "application/json"
+COLUMNS = "application/vnd.chatoffside.columns+json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+
+ALIASES = {
+    "application/x-msgpack": MSGPACK,
+}
+MEDIA_TYPES = [JSON, COLUMNS, MSGPACK, ARROW, ARROW_FILE]
+
+
+def _accepted(header: str):
+    """Media types of an Accept header, best first."""
+    accepted = []
+    for position, item in enumerate(header.split(",")):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type and q > 0:
+            accepted.append((-q, position, media_type.lower()))
+    return [media_type for _, _, media_type in sorted(accepted)]
+
+
+def negotiate(request: Request, response: Response = None):
+    """
+    Columnar media type the client asked for, or None for plain JSON. 406
+    when Accept names only unknown types. Sets Vary: Accept on response, since
+    the same URL has several representations.
+    """
+    if response is not None:
+        response.headers["Vary"] = "Accept"
+    header = request.headers.get("accept")
+    if not header:
+        return None
+    for media_type in _accepted(header):
+        media_type = ALIASES.get(media_type, media_type)
+        if media_type in MEDIA_TYPES:
+            return None if media_type == JSON else media_type
+        if media_type in ("*/*", "application/*"):
+            return None
+    raise HTTPException(
+        status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=f"Acceptable media types: {', '.join(MEDIA_TYPES)}"
+    )
+
+
+def columnar(names, rows):
+    """Transpose result rows into {name: [values]}."""
+    if not rows:
+        return {name: [] for name in names}
+    return dict(zip(names, (list(values) for values in zip(*rows))))
+
+
+###############################################################################
+## Encoders
+
+
+def _columns_json(data, schema):
+    return orjson.dumps(data)
+
+
+def _msgpack(data, schema):
+    try:
+        import msgpack
+    except ImportError:
+        raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=f"{MSGPACK} needs the msgpack package")
+
+    def default(value):
+        # Naive datetimes from the database are UTC; msgpack's timestamp extension.
+        if isinstance(value, datetime):
+            return msgpack.Timestamp.from_datetime(value.replace(tzinfo=value.tzinfo or timezone.utc))
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+    return msgpack.packb(data, default=default)
+
+
+def _arrow_type(pa, annotation):
+    if typing.get_origin(annotation) is typing.Union:
+        options = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(options) == 1:
+            annotation = options[0]
+    return {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        datetime: pa.timestamp("us"),
+    }.get(annotation)
+
+
+def _arrow_table(data, schema, media_type):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=f"{media_type} needs the pyarrow package")
+    fields = schema.__fields__
+    arrays = []
+    for name, values in data.items():
+        arrow_type = _arrow_type(pa, fields[name].outer_type_) if name in fields else None
+        arrays.append(pa.array(values, type=arrow_type))
+    return pa, pa.Table.from_arrays(arrays, names=list(data))
+
+
+def _arrow(data, schema):
+    pa, table = _arrow_table(data, schema, ARROW)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _arrow_file(data, schema):
+    pa, table = _arrow_table(data, schema, ARROW_FILE)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+ENCODERS = {
+    COLUMNS: _columns_json,
+    MSGPACK: _msgpack,
+    ARROW: _arrow,
+    ARROW_FILE: _arrow_file,
+}
+
+
+def respond(media_type: str, columns, rows, schema, response: Response = None):
+    """
+    Columnar response of media_type for result rows of columns. Headers set on
+    the route's injected response (cursors, ETags, Vary) are carried over.
+    """
+    names = [column.key for column in columns]
+    body = ENCODERS[media_type](columnar(names, rows), schema)
+    fast = Response(body, media_type=media_type)
+    if response is not None:
+        fast.raw_headers.extend(
+            (key, value) for key, value in response.raw_headers if key not in (b"content-length", b"content-type")
+        )
+    return fast
@@ -1,6 +1,8 @@
 from sqlalchemy.dialects.postgresql import TEXT
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, literal_column
 from sqlalchemy.orm import relationship
+from datetime import datetime
+from textcompression import CompressedText
 
 # from database import Base
 
@@ -26,6 +28,18 @@ from sqlmodel import Field, Relationship, Session, SQLModel, create_engine
 #     password = Column(String)
 #     posts = relationship("Post", back_populates="author")
 
+###############################################################################
+# Row versioning
+# version and updated_at are set by the database layer on every INSERT and
+# UPDATE (ORM or Core, so bulk updates count too). They back the ETag and
+# Last-Modified headers of the read routes.
+
+def version_field():
+    return Field(default=1, sa_column_kwargs={"default": 1, "onupdate": literal_column("version") + 1})
+
+def updated_at_field():
+    return Field(default_factory=datetime.utcnow, sa_column_kwargs={"default": datetime.utcnow, "onupdate": datetime.utcnow})
+
 ###############################################################################
 # UserProfessionLink
 
@@ -41,23 +55,29 @@ class UserProfessionLink(SQLModel, table=True):
 ## Profession
 class ProfessionBase(SQLModel):
     title: str
-    description: str = Field(sa_column=Column(TEXT))
+    description: str = Field(sa_column=Column(CompressedText("profession.description")))
 
 
 class Profession(ProfessionBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = version_field()
+    updated_at: datetime = updated_at_field()
     users: List["User"] = Relationship(back_populates="professions", link_model=UserProfessionLink)
 ###############################################################################
 # User
 class UserBase(SQLModel):
     name: str = Field(index=True)
-    email: str
+    email: str = Field(index=True, unique=True)
     password: str
     profession_id: Optional[int] = Field(default=None, foreign_key="profession.id")
     is_admin: bool = Field(default=False)
 
 class User(UserBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = version_field()
+    updated_at: datetime = updated_at_field()
+    # Set by DELETE /users/{id}; see deletion.py
+    deleted_at: Optional[datetime] = Field(default=None, index=True)
     posts: List["Post"] = Relationship(back_populates="author")
     prompts: List["Prompt"] = Relationship(back_populates="author")
     projects: List["Project"] = Relationship(back_populates="author")
@@ -94,7 +114,8 @@ class ProfessionUpdate(SQLModel):
     users: Optional[List["User"]] = None
 
 class ProfessionReadWithUser(ProfessionRead):
-    users: Optional[List["User"]] = None
+    users: Optional[List[UserRead]] = None
+    users_next_cursor: Optional[str] = None
 
 class UserReadWithProfessions(UserRead):
     professions: List[ProfessionRead] = []
@@ -110,12 +131,22 @@ class PostBase(SQLModel):
 
 
 class Post(PostBase, table=True):
+    # (author_id, id) serves both author lookups and keyset pages (see pagination.py).
+    __table_args__ = (Index("ix_post_author_id_id", "author_id", "id"),)
     id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = version_field()
+    updated_at: datetime = updated_at_field()
     author: Optional[User] = Relationship(back_populates="posts")
 
 class PostRead(PostBase):
     id: Optional[int] = None
 
+class PostReadPartial(SQLModel):
+    id: Optional[int] = None
+    title: Optional[str] = None
+    body: Optional[str] = None
+    author_id: Optional[int] = None
+
 class PostCreate(PostBase):
     pass
 
@@ -128,25 +159,30 @@ class PostUpdate(SQLModel):
 class PostReadWithUser(PostRead):
     author: Optional[UserRead] = None
 
-class UserReadWithPosts(UserRead):
-    posts: List[PostRead] = []
-    prompts: List[PostRead] = []
-
 ###############################################################################
 # Prompt
 class PromptBase(SQLModel):
     title: str
-    body: str = Field(sa_column=Column(TEXT))
+    body: str = Field(sa_column=Column(CompressedText("prompt.body")))
     author_id: Optional[int] = Field(default=None, foreign_key="user.id")
 
 
 class Prompt(PromptBase, table=True):
+    __table_args__ = (Index("ix_prompt_author_id_id", "author_id", "id"),)
     id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = version_field()
+    updated_at: datetime = updated_at_field()
     author: Optional[User] = Relationship(back_populates="prompts")
 
 class PromptRead(PromptBase):
     id: Optional[int] = None
 
+class PromptReadPartial(SQLModel):
+    id: Optional[int] = None
+    title: Optional[str] = None
+    body: Optional[str] = None
+    author_id: Optional[int] = None
+
 class PromptCreate(PromptBase):
     pass
 
@@ -166,17 +202,26 @@ class UserReadWithPrompts(UserRead):
 # Project
 class ProjectBase(SQLModel):
     title: str
-    body: str = Field(sa_column=Column(TEXT))
+    body: str = Field(sa_column=Column(CompressedText("project.body")))
     author_id: Optional[int] = Field(default=None, foreign_key="user.id")
 
 
 class Project(ProjectBase, table=True):
+    __table_args__ = (Index("ix_project_author_id_id", "author_id", "id"),)
     id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = version_field()
+    updated_at: datetime = updated_at_field()
     author: Optional[User] = Relationship(back_populates="projects")
 
 class ProjectRead(ProjectBase):
     id: Optional[int] = None
 
+class ProjectReadPartial(SQLModel):
+    id: Optional[int] = None
+    title: Optional[str] = None
+    body: Optional[str] = None
+    author_id: Optional[int] = None
+
 class ProjectCreate(ProjectBase):
     pass
 
@@ -192,6 +237,104 @@ class ProjectReadWithUser(ProjectRead):
 class UserReadWithProjects(UserRead):
     projects: List[ProjectRead] = []
 
+class UserReadWithPosts(UserRead):
+    posts: List[PostRead] = []
+    prompts: List[PromptRead] = []
+    projects: List[ProjectRead] = []
+    posts_next_cursor: Optional[str] = None
+    prompts_next_cursor: Optional[str] = None
+    projects_next_cursor: Optional[str] = None
+
+###############################################################################
+# Search
+class SearchResult(SQLModel):
+    type: str
+    id: int
+    title: str
+    rank: float
+
+###############################################################################
+# Bulk operations
+class BulkItemError(SQLModel):
+    index: int
+    id: Optional[int] = None
+    detail: Union[str, list]
+
+class BulkDelete(SQLModel):
+    ids: List[int]
+
+class BulkDeleteResult(SQLModel):
+    deleted: List[int] = []
+    errors: List[BulkItemError] = []
+
+class PostBulkResult(SQLModel):
+    items: List[PostRead] = []
+    errors: List[BulkItemError] = []
+
+class PromptBulkResult(SQLModel):
+    items: List[PromptRead] = []
+    errors: List[BulkItemError] = []
+
+class ProjectBulkResult(SQLModel):
+    items: List[ProjectRead] = []
+    errors: List[BulkItemError] = []
+
+# Multi-get: items follow the requested ids, with None (and an error) for
+# ids that were not found.
+class PostBulkRead(SQLModel):
+    items: List[Optional[PostReadWithUser]] = []
+    errors: List[BulkItemError] = []
+
+class PromptBulkRead(SQLModel):
+    items: List[Optional[PromptReadWithUser]] = []
+    errors: List[BulkItemError] = []
+
+class ProjectBulkRead(SQLModel):
+    items: List[Optional[ProjectReadWithUser]] = []
+    errors: List[BulkItemError] = []
+
+###############################################################################
+# Currency conversion
+class CurrencyConversion(SQLModel):
+    base: str
+    target: str
+    amount: float
+    rate: float
+    result: float
+    last_updated_at: str
+
+# Columns of a batch: item i converts amount[i] from base[i] to target[i].
+# A column of length 1 applies to every item.
+class CurrencyBatch(SQLModel):
+    base: List[str]
+    target: List[str]
+    amount: List[float]
+
+class CurrencyBatchResult(SQLModel):
+    rates: List[float]
+    results: List[float]
+    last_updated_at: str
+
+# rates[i][j] is the price of one bases[i] in targets[j].
+class CurrencyCrossRates(SQLModel):
+    bases: List[str]
+    targets: List[str]
+    rates: List[List[float]]
+    last_updated_at: str
+
+# History: rates against USD as recorded from each snapshot.
+class CurrencyHistoryRate(SQLModel):
+    code: str
+    date: str
+    rate: float
+    recorded_at: datetime
+
+class CurrencyHistoryRange(SQLModel):
+    code: str
+    interval: str
+    timestamps: List[datetime]
+    rates: List[float]
+
 ###############################################################################
 # Auth
 class Login(SQLModel):
@@ -202,8 +345,30 @@ class Login(SQLModel):
 class Token(SQLModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
 
 class TokenData(SQLModel):
     email: str | None = None
 
+class TokenRefresh(SQLModel):
+    refresh_token: str
+
+# Only the SHA-256 of a refresh token is stored. Tokens issued by rotation
+# share a family_id so a replayed (already rotated) token revokes the family.
+class RefreshToken(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    token_hash: str = Field(index=True, unique=True)
+    family_id: str = Field(index=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+    revoked_at: Optional[datetime] = None
+    replaced_by_id: Optional[int] = None
+
+# Records done per bulk_import.py input, saved in the transaction that loads them.
+class ImportProgress(SQLModel, table=True):
+    source: str = Field(primary_key=True)
+    done: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
 ###############################################################################
@@ -6,9 +6,10 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
-from sqlmodel import Session
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 import accesstoken
-from database import get_db
+from database import get_db, get_async_session
 import models
 
 dotenv_path = join(dirname(__file__), '.env')
@@ -19,12 +20,7 @@ ALGORITHM = os.environ.get("ALGORITHM")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], request: Request, session: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def decode_token_email(token: str):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
@@ -33,6 +29,15 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], reques
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    return email
+
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], request: Request, session: Session = Depends(get_db)):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    email = decode_token_email(token)
 
     user = session.query(models.User).filter(models.User.email == email).first()
 
@@ -42,3 +47,22 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], reques
     return user
     # return accesstoken.verify_token(token, credentials_exception)
 
+async def get_current_admin(current_user: models.User = Depends(get_current_user)):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
+
+async def get_current_user_async(token: Annotated[str, Depends(oauth2_scheme)], session: AsyncSession = Depends(get_async_session)):
+    email = decode_token_email(token)
+
+    result = await session.exec(select(models.User).where(models.User.email == email))
+    user = result.first()
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return user
@@ -0,0 +1,52 @@
+import base64
+import json
+from fastapi import HTTPException, Response, status
+
+###############################################################################
+## Keyset (cursor) pagination
+#
+# List routes return rows ordered by id. When more rows follow, the response
+# carries an opaque X-Next-Cursor header; passing it back as ?cursor= resumes
+# strictly after the last row seen, so deep pages cost the same as the first
+# one and concurrent inserts or deletes cannot shift rows between pages.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int):
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor {cursor}")
+
+
+def keyset(statement, id_column, cursor: str | None):
+    """Order statement by id_column and start after cursor when one is given."""
+    if cursor:
+        statement = statement.where(id_column > decode_cursor(cursor))
+    return statement.order_by(id_column)
+
+
+def split_page(rows, limit: int):
+    """
+    Trim rows fetched with limit + 1 to limit. Returns the rows and the cursor
+    of the next page, or None if the extra row shows there is nothing more.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].id)
+    return rows, None
+
+
+def page(response: Response, rows, limit: int):
+    """split_page for list routes: the next cursor goes in a response header."""
+    rows, next_cursor = split_page(rows, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
@@ -0,0 +1,110 @@
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, noload
+from sqlmodel import select
+import models
+import pagination
+
+###############################################################################
+## Related data for the detail routes
+#
+# Relationships are never lazy loaded while serializing: to-one relations are
+# joined into the main query, and to-many collections are read with one
+# capped, keyset-paginated query each. Every function takes a sync Session;
+# the async routers call them through AsyncSession.run_sync.
+# user_with_collections returns the response fields as a dict of ORM objects,
+# serialized by serialization.respond without another validation pass.
+
+USER_COLLECTIONS = {
+    "posts": models.Post,
+    "prompts": models.Prompt,
+    "projects": models.Project,
+}
+
+
+def parse_include(include: str, allowed):
+    requested = {name.strip() for name in include.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot include {', '.join(sorted(unknown))}; choose from {', '.join(allowed)}",
+        )
+    return requested
+
+
+def _collection_page(session, statement, id_column, cursor, limit):
+    rows = session.exec(pagination.keyset(statement, id_column, cursor).limit(limit + 1)).all()
+    return pagination.split_page(rows, limit)
+
+
+def with_author(session, model, entity_id: int, include):
+    """Post, prompt or project by id, with its author joined in when included."""
+    loader = joinedload(model.author) if "author" in include else noload(model.author)
+    return session.exec(select(model).where(model.id == entity_id).options(loader)).first()
+
+
+def user_with_collections(session, user_id: int, include, limit: int, cursors):
+    user = session.get(models.User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail=f"User with id {user_id} not found")
+
+    fields = {name: getattr(user, name) for name in models.UserRead.__fields__}
+    for name in include:
+        model = USER_COLLECTIONS[name]
+        fields[name], fields[f"{name}_next_cursor"] = _collection_page(
+            session, select(model).where(model.author_id == user_id), model.id, cursors.get(name), limit
+        )
+    return fields
+
+
+def profession_users(profession_id: int, *entities):
+    """Select entities (User or User columns) of the users linked to a profession."""
+    return select(*entities).join(
+        models.UserProfessionLink, models.UserProfessionLink.user_id == models.User.id
+    ).where(models.UserProfessionLink.profession_id == profession_id)
+
+
+def profession_users_pages(profession_ids, limit: int, *entities):
+    """
+    Select (profession_id, *entities) of the first limit + 1 users (by id) of
+    each profession, for list pages: one query however many professions.
+    """
+    link = models.UserProfessionLink
+    ranked = select(
+        link.profession_id,
+        models.User.id.label("user_id"),
+        func.row_number().over(partition_by=link.profession_id, order_by=models.User.id).label("position"),
+    ).join(models.User, models.User.id == link.user_id).where(
+        # deletion.visible does not reach into subqueries; rank only live users
+        link.profession_id.in_(profession_ids), models.User.deleted_at.is_(None)
+    ).subquery()
+    return select(ranked.c.profession_id, *entities).join(
+        models.User, models.User.id == ranked.c.user_id
+    ).where(ranked.c.position <= limit + 1).order_by(ranked.c.profession_id, models.User.id)
+
+
+def professions_with_users(session, professions, limit: int):
+    """A list page of professions, each with at most limit users and the cursor to the rest."""
+    users = {profession.id: [] for profession in professions}
+    if users:
+        for profession_id, user in session.exec(profession_users_pages(list(users), limit, models.User)).all():
+            users[profession_id].append(user)
+    page = []
+    for profession in professions:
+        fields = dict(models.ProfessionBase.from_orm(profession).dict(), id=profession.id)
+        fields["users"], fields["users_next_cursor"] = pagination.split_page(users[profession.id], limit)
+        page.append(models.ProfessionReadWithUser(**fields))
+    return page
+
+
+def profession_with_users(session, profession_id: int, include, limit: int, cursor: str | None):
+    profession = session.get(models.Profession, profession_id)
+    if not profession:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Profession with id {profession_id} is not available")
+
+    fields = dict(models.ProfessionBase.from_orm(profession).dict(), id=profession.id)
+    if "users" in include:
+        statement = profession_users(profession_id, models.User)
+        fields["users"], fields["users_next_cursor"] = _collection_page(session, statement, models.User.id, cursor, limit)
+    return models.ProfessionReadWithUser(**fields)
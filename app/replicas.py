@@ -0,0 +1,167 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+import accesstoken
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+###############################################################################
+## Replica set
+#
+# Read-only requests are spread round robin over the healthy replicas; every
+# other request goes to the primary. A replica is taken out of rotation when
+# a connection to it fails with a disconnect error or a health probe fails,
+# and is tried again after retry_after seconds (or as soon as a probe passes).
+# With no healthy replica, reads fall back to the primary.
+
+class Replica:
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.down_until = 0.0
+        self.last_error = None
+
+
+class ReplicaSet:
+    def __init__(self, primary, replicas, retry_after: float = 30):
+        self.primary = primary
+        self.replicas = [Replica(name, engine) for name, engine in replicas]
+        self.retry_after = retry_after
+        self._counter = itertools.count()
+        for replica in self.replicas:
+            sync_engine = getattr(replica.engine, "sync_engine", replica.engine)
+            event.listen(sync_engine, "handle_error", self._on_error(replica))
+
+    def _on_error(self, replica):
+        def handle_error(context):
+            if context.is_disconnect:
+                self.mark_down(replica, context.original_exception)
+        return handle_error
+
+    def mark_down(self, replica, error=None):
+        if replica.down_until <= time.monotonic():
+            logger.warning(f"Replica {replica.name} marked down: {error}")
+        replica.down_until = time.monotonic() + self.retry_after
+        replica.last_error = str(error) if error else None
+
+    def mark_up(self, replica):
+        if replica.down_until > time.monotonic():
+            logger.info(f"Replica {replica.name} is back in rotation")
+        replica.down_until = 0.0
+        replica.last_error = None
+
+    def pick(self):
+        """Next healthy replica engine in round robin order, else the primary."""
+        if not self.replicas:
+            return self.primary
+        start = next(self._counter)
+        now = time.monotonic()
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(start + i) % len(self.replicas)]
+            if replica.down_until <= now:
+                return replica.engine
+        return self.primary
+
+    def probe(self):
+        """Check every replica with SELECT 1 (sync engines)."""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                self.mark_up(replica)
+            except Exception as e:
+                self.mark_down(replica, e)
+
+    async def probe_async(self):
+        """probe for async engines."""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+                self.mark_up(replica)
+            except Exception as e:
+                self.mark_down(replica, e)
+
+    def start_health_checks(self, interval: float):
+        """
+        Probe every interval seconds: sync engines from a thread, async ones
+        from a task on the running event loop (their pooled connections
+        belong to that loop), so call this from app startup.
+        """
+        if not self.replicas:
+            return
+
+        if isinstance(self.replicas[0].engine, AsyncEngine):
+            async def run_async():
+                while True:
+                    await asyncio.sleep(interval)
+                    await self.probe_async()
+
+            self._health_task = asyncio.get_running_loop().create_task(run_async())
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.probe()
+
+        threading.Thread(target=run, name="replica-health", daemon=True).start()
+
+    def status(self):
+        now = time.monotonic()
+        return {
+            replica.name: {"healthy": replica.down_until <= now, "last_error": replica.last_error}
+            for replica in self.replicas
+        }
+
+###############################################################################
+## Read-your-writes
+#
+# After a client writes, its reads go to the primary for `window` seconds so
+# replication lag never hides its own change. Clients are identified by the
+# user (the sub claim) of their access token, so the window survives a token
+# refresh. The map is per process: with several workers a read
+# can land on a worker that did not see the write, so keep the window a little
+# longer than the expected replication lag.
+
+class StickyWrites:
+    def __init__(self, window: float = 5):
+        self.window = window
+        self._until = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def client_key(request):
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        return accesstoken.token_subject(token)
+
+    def mark(self, key):
+        if key is None or self.window <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._until[key] = now + self.window
+            if len(self._until) > 10000:
+                self._until = {k: v for k, v in self._until.items() if v > now}
+
+    def is_sticky(self, key):
+        return key is not None and self._until.get(key, 0.0) > time.monotonic()
+
+
+def route(request, replica_set: ReplicaSet, sticky: StickyWrites):
+    """Engine for this request, and the client key to mark if it writes."""
+    key = sticky.client_key(request)
+    if request.method in READ_METHODS:
+        if sticky.is_sticky(key):
+            return replica_set.primary, None
+        return replica_set.pick(), None
+    return replica_set.primary, key
@@ -0,0 +1,160 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from typing import List
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Query, Body
+import database, models
+from sqlalchemy import select as sa_select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+import oauth2
+import bulk
+import pagination
+import serialization
+import relations
+import fieldsets
+import formats
+import conditional
+
+router = APIRouter(
+    tags = ['Posts']
+)
+
+###############################################################################
+## Post (async)
+
+@router.post('/posts/', response_model=models.PostRead)
+async def create_post(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    post: models.PostCreate
+):
+    db_post = models.Post.from_orm(post)
+    session.add(db_post)
+    await session.commit()
+    await session.refresh(db_post)
+    return db_post
+
+@router.get('/posts/bulk', response_model=models.PostBulkRead)
+async def read_posts_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    ids: str = Query(..., description="Comma separated ids, e.g. 1,2,3"),
+):
+    content = await session.run_sync(bulk.read_many, models.Post, bulk.parse_ids(ids))
+    return serialization.respond(models.PostBulkRead, content)
+
+@router.post('/posts/bulk', response_model=models.PostBulkResult)
+async def create_posts_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    items: List[dict] = Body(...)
+):
+    return await session.run_sync(bulk.create, models.Post, models.PostCreate, items)
+
+@router.patch('/posts/bulk', response_model=models.PostBulkResult)
+async def update_posts_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    items: List[dict] = Body(...)
+):
+    return await session.run_sync(bulk.update_many, models.Post, models.PostUpdate, items)
+
+@router.delete('/posts/bulk', response_model=models.BulkDeleteResult)
+async def delete_posts_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: models.BulkDelete
+):
+    return await session.run_sync(bulk.delete_many, models.Post, request.ids)
+
+@router.get('/posts', response_model=List[models.PostReadPartial], response_model_exclude_unset=True)
+async def read_posts(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: Request,
+    response: Response,
+    offset: int = 0,
+    limit: int = Query(default=100, lte=100),
+    cursor: str | None = None,
+    fields: str | None = Query(default=None, description="Comma separated columns to return, e.g. id,title"),
+):
+    owned = models.Post.author_id == current_user.id
+    media_type = formats.negotiate(request, response)
+    versions = await session.run_sync(conditional.list_versions, models.Post, owned, cursor, offset, limit)
+    not_modified = conditional.check(request, response, versions, collection=True)
+    if not_modified:
+        return not_modified
+
+    columns = fieldsets.columns(models.Post, fields, models.PostReadPartial, every=bool(media_type))
+    statement = pagination.keyset(
+        sa_select(*(columns or [models.Post])).where(owned), models.Post.id, cursor
+    )
+    result = await session.execute(statement.offset(offset).limit(limit + 1))
+    rows = result.all() if columns else result.scalars().all()
+    if media_type:
+        return formats.respond(media_type, columns, pagination.page(response, rows, limit), models.PostReadPartial, response)
+    return serialization.respond(List[models.PostReadPartial], pagination.page(response, rows, limit), response, exclude_unset=True)
+
+@router.get('/posts/{post_id}', response_model=models.PostReadWithUser)
+async def read_post(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: Request,
+    response: Response,
+    post_id: int,
+    include: str = Query(default="author", description="author, or empty for none"),
+):
+    include = relations.parse_include(include, ["author"])
+    versions = await session.run_sync(conditional.entity_versions, models.Post, post_id, include)
+    if versions:
+        not_modified = conditional.check(request, response, versions)
+        if not_modified:
+            return not_modified
+
+    post = await session.run_sync(relations.with_author, models.Post, post_id, include)
+    if not post:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Post with id {post_id} is not available")
+    return post
+
+@router.patch('/posts/{post_id}', response_model=models.PostRead)
+async def update_post(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    post_id: int,
+    post: models.PostUpdate
+):
+    db_post = await session.get(models.Post, post_id)
+    if not db_post:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Post with id {post_id} not found")
+    post_data = post.dict(exclude_unset=True)
+    for key, value in post_data.items():
+        setattr(db_post, key, value)
+    session.add(db_post)
+    await session.commit()
+    await session.refresh(db_post)
+    return db_post
+
+@router.delete('/posts/{post_id}')
+async def delete_post(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    post_id: int,
+):
+    post = await session.get(models.Post, post_id)
+    if not post:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Post with id {post_id} not found")
+    await session.delete(post)
+    await session.commit()
+    return {'detail': f"Post with id {post_id} was deleted"}
+
+
+###############################################################################
@@ -0,0 +1,116 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from typing import List
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Query
+import database, models
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+import oauth2
+import pagination
+import relations
+import conditional
+
+router = APIRouter(
+    tags = ['Professions']
+)
+
+###############################################################################
+## Profession (async)
+
+@router.post('/professions/', response_model=models.ProfessionRead)
+async def create_profession(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    profession: models.ProfessionCreate
+):
+    db_profession = models.Profession.from_orm(profession)
+    session.add(db_profession)
+    await session.commit()
+    await session.refresh(db_profession)
+    return profession
+
+@router.get('/professions', response_model=List[models.ProfessionReadWithUser])
+async def read_professions(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: Request,
+    response: Response,
+    offset: int = 0,
+    limit: int = Query(default=100, lte=100),
+    cursor: str | None = None,
+    users_limit: int = Query(default=20, lte=100, description="Maximum users per profession"),
+):
+    versions = await session.run_sync(conditional.profession_list_versions, cursor, offset, limit, users_limit)
+    not_modified = conditional.check(request, response, versions, collection=True)
+    if not_modified:
+        return not_modified
+
+    statement = pagination.keyset(select(models.Profession), models.Profession.id, cursor)
+    result = await session.exec(statement.offset(offset).limit(limit + 1))
+    professions = pagination.page(response, result.all(), limit)
+    # Capped like the detail route; the rest via /professions/{id}?users_cursor=
+    return await session.run_sync(relations.professions_with_users, professions, users_limit)
+
+@router.get('/professions/{profession_id}', response_model=models.ProfessionReadWithUser)
+async def read_profession(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: Request,
+    response: Response,
+    profession_id: int,
+    include: str = Query(default="users", description="users, or empty for none"),
+    limit: int = Query(default=20, lte=100, description="Maximum users returned"),
+    users_cursor: str | None = None,
+):
+    include = relations.parse_include(include, ["users"])
+    versions = await session.run_sync(conditional.profession_versions, profession_id, include, limit, users_cursor)
+    if versions:
+        not_modified = conditional.check(request, response, versions, collection="users" in include)
+        if not_modified:
+            return not_modified
+
+    return await session.run_sync(relations.profession_with_users, profession_id, include, limit, users_cursor)
+
+@router.patch('/professions/{profession_id}', response_model=models.ProfessionRead)
+async def update_profession(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    profession_id: int,
+    profession: models.ProfessionUpdate
+):
+    db_profession = await session.get(models.Profession, profession_id)
+    if not db_profession:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Profession with id {profession_id} not found")
+    profession_data = profession.dict(exclude_unset=True)
+    for key, value in profession_data.items():
+        setattr(db_profession, key, value)
+    session.add(db_profession)
+    await session.commit()
+    result = await session.exec(
+        select(models.Profession).where(models.Profession.id == profession_id)
+        .options(selectinload(models.Profession.users))
+        .execution_options(populate_existing=True)
+    )
+    return result.first()
+
+@router.delete('/professions/{profession_id}')
+async def delete_profession(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    profession_id: int,
+):
+    profession = await session.get(models.Profession, profession_id)
+    if not profession:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Profession with id {profession_id} not found")
+    await session.delete(profession)
+    await session.commit()
+    return {'detail': f"Profession with id {profession_id} was deleted"}
+
+
+###############################################################################
@@ -0,0 +1,160 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from typing import List
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Query, Body
+import database, models
+from sqlalchemy import select as sa_select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+import oauth2
+import bulk
+import pagination
+import serialization
+import relations
+import fieldsets
+import formats
+import conditional
+
+router = APIRouter(
+    tags = ['Projects']
+)
+
+###############################################################################
+## Project (async)
+
+@router.post('/projects/', response_model=models.ProjectRead)
+async def create_project(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    project: models.ProjectCreate
+):
+    db_project = models.Project.from_orm(project)
+    session.add(db_project)
+    await session.commit()
+    await session.refresh(db_project)
+    return db_project
+
+@router.get('/projects/bulk', response_model=models.ProjectBulkRead)
+async def read_projects_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    ids: str = Query(..., description="Comma separated ids, e.g. 1,2,3"),
+):
+    content = await session.run_sync(bulk.read_many, models.Project, bulk.parse_ids(ids))
+    return serialization.respond(models.ProjectBulkRead, content)
+
+@router.post('/projects/bulk', response_model=models.ProjectBulkResult)
+async def create_projects_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    items: List[dict] = Body(...)
+):
+    return await session.run_sync(bulk.create, models.Project, models.ProjectCreate, items)
+
+@router.patch('/projects/bulk', response_model=models.ProjectBulkResult)
+async def update_projects_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    items: List[dict] = Body(...)
+):
+    return await session.run_sync(bulk.update_many, models.Project, models.ProjectUpdate, items)
+
+@router.delete('/projects/bulk', response_model=models.BulkDeleteResult)
+async def delete_projects_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: models.BulkDelete
+):
+    return await session.run_sync(bulk.delete_many, models.Project, request.ids)
+
+@router.get('/projects', response_model=List[models.ProjectReadPartial], response_model_exclude_unset=True)
+async def read_projects(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: Request,
+    response: Response,
+    offset: int = 0,
+    limit: int = Query(default=100, lte=100),
+    cursor: str | None = None,
+    fields: str | None = Query(default=None, description="Comma separated columns to return, e.g. id,title"),
+):
+    owned = models.Project.author_id == current_user.id
+    media_type = formats.negotiate(request, response)
+    versions = await session.run_sync(conditional.list_versions, models.Project, owned, cursor, offset, limit)
+    not_modified = conditional.check(request, response, versions, collection=True)
+    if not_modified:
+        return not_modified
+
+    columns = fieldsets.columns(models.Project, fields, models.ProjectReadPartial, every=bool(media_type))
+    statement = pagination.keyset(
+        sa_select(*(columns or [models.Project])).where(owned), models.Project.id, cursor
+    )
+    result = await session.execute(statement.offset(offset).limit(limit + 1))
+    rows = result.all() if columns else result.scalars().all()
+    if media_type:
+        return formats.respond(media_type, columns, pagination.page(response, rows, limit), models.ProjectReadPartial, response)
+    return serialization.respond(List[models.ProjectReadPartial], pagination.page(response, rows, limit), response, exclude_unset=True)
+
+@router.get('/projects/{project_id}', response_model=models.ProjectReadWithUser)
+async def read_project(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: Request,
+    response: Response,
+    project_id: int,
+    include: str = Query(default="author", description="author, or empty for none"),
+):
+    include = relations.parse_include(include, ["author"])
+    versions = await session.run_sync(conditional.entity_versions, models.Project, project_id, include)
+    if versions:
+        not_modified = conditional.check(request, response, versions)
+        if not_modified:
+            return not_modified
+
+    project = await session.run_sync(relations.with_author, models.Project, project_id, include)
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Project with id {project_id} is not available")
+    return project
+
+@router.patch('/projects/{project_id}', response_model=models.ProjectRead)
+async def update_project(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    project_id: int,
+    project: models.ProjectUpdate
+):
+    db_project = await session.get(models.Project, project_id)
+    if not db_project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Project with id {project_id} not found")
+    project_data = project.dict(exclude_unset=True)
+    for key, value in project_data.items():
+        setattr(db_project, key, value)
+    session.add(db_project)
+    await session.commit()
+    await session.refresh(db_project)
+    return db_project
+
+@router.delete('/projects/{project_id}')
+async def delete_project(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    project_id: int,
+):
+    project = await session.get(models.Project, project_id)
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Project with id {project_id} not found")
+    await session.delete(project)
+    await session.commit()
+    return {'detail': f"Project with id {project_id} was deleted"}
+
+
+###############################################################################
@@ -0,0 +1,160 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from typing import List
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Query, Body
+import database, models
+from sqlalchemy import select as sa_select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+import oauth2
+import bulk
+import pagination
+import serialization
+import relations
+import fieldsets
+import formats
+import conditional
+
+router = APIRouter(
+    tags = ['Prompts']
+)
+
+###############################################################################
+## Prompt (async)
+
+@router.post('/prompts/', response_model=models.PromptRead)
+async def create_prompt(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    prompt: models.PromptCreate
+):
+    db_prompt = models.Prompt.from_orm(prompt)
+    session.add(db_prompt)
+    await session.commit()
+    await session.refresh(db_prompt)
+    return db_prompt
+
+@router.get('/prompts/bulk', response_model=models.PromptBulkRead)
+async def read_prompts_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    ids: str = Query(..., description="Comma separated ids, e.g. 1,2,3"),
+):
+    content = await session.run_sync(bulk.read_many, models.Prompt, bulk.parse_ids(ids))
+    return serialization.respond(models.PromptBulkRead, content)
+
+@router.post('/prompts/bulk', response_model=models.PromptBulkResult)
+async def create_prompts_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    items: List[dict] = Body(...)
+):
+    return await session.run_sync(bulk.create, models.Prompt, models.PromptCreate, items)
+
+@router.patch('/prompts/bulk', response_model=models.PromptBulkResult)
+async def update_prompts_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    items: List[dict] = Body(...)
+):
+    return await session.run_sync(bulk.update_many, models.Prompt, models.PromptUpdate, items)
+
+@router.delete('/prompts/bulk', response_model=models.BulkDeleteResult)
+async def delete_prompts_bulk(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: models.BulkDelete
+):
+    return await session.run_sync(bulk.delete_many, models.Prompt, request.ids)
+
+@router.get('/prompts', response_model=List[models.PromptReadPartial], response_model_exclude_unset=True)
+async def read_prompts(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: Request,
+    response: Response,
+    offset: int = 0,
+    limit: int = Query(default=100, lte=100),
+    cursor: str | None = None,
+    fields: str | None = Query(default=None, description="Comma separated columns to return, e.g. id,title"),
+):
+    owned = models.Prompt.author_id == current_user.id
+    media_type = formats.negotiate(request, response)
+    versions = await session.run_sync(conditional.list_versions, models.Prompt, owned, cursor, offset, limit)
+    not_modified = conditional.check(request, response, versions, collection=True)
+    if not_modified:
+        return not_modified
+
+    columns = fieldsets.columns(models.Prompt, fields, models.PromptReadPartial, every=bool(media_type))
+    statement = pagination.keyset(
+        sa_select(*(columns or [models.Prompt])).where(owned), models.Prompt.id, cursor
+    )
+    result = await session.execute(statement.offset(offset).limit(limit + 1))
+    rows = result.all() if columns else result.scalars().all()
+    if media_type:
+        return formats.respond(media_type, columns, pagination.page(response, rows, limit), models.PromptReadPartial, response)
+    return serialization.respond(List[models.PromptReadPartial], pagination.page(response, rows, limit), response, exclude_unset=True)
+
+@router.get('/prompts/{prompt_id}', response_model=models.PromptReadWithUser)
+async def read_prompt(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    request: Request,
+    response: Response,
+    prompt_id: int,
+    include: str = Query(default="author", description="author, or empty for none"),
+):
+    include = relations.parse_include(include, ["author"])
+    versions = await session.run_sync(conditional.entity_versions, models.Prompt, prompt_id, include)
+    if versions:
+        not_modified = conditional.check(request, response, versions)
+        if not_modified:
+            return not_modified
+
+    prompt = await session.run_sync(relations.with_author, models.Prompt, prompt_id, include)
+    if not prompt:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Prompt with id {prompt_id} is not available")
+    return prompt
+
+@router.patch('/prompts/{prompt_id}', response_model=models.PromptRead)
+async def update_prompt(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    prompt_id: int,
+    prompt: models.PromptUpdate
+):
+    db_prompt = await session.get(models.Prompt, prompt_id)
+    if not db_prompt:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Prompt with id {prompt_id} not found")
+    prompt_data = prompt.dict(exclude_unset=True)
+    for key, value in prompt_data.items():
+        setattr(db_prompt, key, value)
+    session.add(db_prompt)
+    await session.commit()
+    await session.refresh(db_prompt)
+    return db_prompt
+
+@router.delete('/prompts/{prompt_id}')
+async def delete_prompt(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    current_user: models.User = Depends(oauth2.get_current_user_async),
+    prompt_id: int,
+):
+    prompt = await session.get(models.Prompt, prompt_id)
+    if not prompt:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Prompt with id {prompt_id} not found")
+    await session.delete(prompt)
+    await session.commit()
+    return {'detail': f"Prompt with id {prompt_id} was deleted"}
+
+
+###############################################################################
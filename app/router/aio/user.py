@@ -0,0 +1,127 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from typing import List
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import database, models
+from sqlalchemy.exc import IntegrityError
+from hashing import Hash
+import pagination
+import serialization
+import relations
+import fieldsets
+import formats
+import deletion
+
+router = APIRouter(
+    tags = ['Users']
+)
+
+
+###############################################################################
+## User (async)
+
+@router.post('/users/', response_model=models.UserRead)
+async def create_user(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    user: models.UserCreate
+):
+    # bcrypt is CPU bound; keep it off the event loop
+    hashed_password = await run_in_threadpool(Hash.bcrypt, user.password)
+
+    db_user = models.User(
+        name=user.name,
+        email=user.email,
+        password=hashed_password
+    )
+
+    session.add(db_user)
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"User with email {user.email} already exists")
+    await session.refresh(db_user)
+    return db_user
+
+@router.get('/users/', response_model=List[models.UserRead])
+async def read_users(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    request: Request,
+    response: Response,
+    offset: int = 0,
+    limit: int = Query(default=100, lte=100),
+    cursor: str | None = None,
+):
+    media_type = formats.negotiate(request, response)
+    if media_type:
+        columns = fieldsets.columns(models.User, None, models.UserRead, every=True)
+        statement = pagination.keyset(select(*columns), models.User.id, cursor)
+        rows = (await session.execute(statement.offset(offset).limit(limit + 1))).all()
+        return formats.respond(media_type, columns, pagination.page(response, rows, limit), models.UserRead, response)
+    statement = pagination.keyset(select(models.User), models.User.id, cursor)
+    result = await session.exec(statement.offset(offset).limit(limit + 1))
+    return serialization.respond(List[models.UserRead], pagination.page(response, result.all(), limit), response)
+
+@router.get('/users/{user_id}', response_model=models.UserReadWithPosts)
+async def read_user(
+    *,
+    user_id:int,
+    session: AsyncSession = Depends(database.get_async_session),
+    include: str = Query(default="posts,prompts", description="Comma separated: posts, prompts, projects"),
+    limit: int = Query(default=20, lte=100, description="Maximum items per included collection"),
+    posts_cursor: str | None = None,
+    prompts_cursor: str | None = None,
+    projects_cursor: str | None = None,
+):
+    include = relations.parse_include(include, relations.USER_COLLECTIONS)
+    content = await session.run_sync(
+        relations.user_with_collections, user_id, include, limit, {"posts": posts_cursor, "prompts": prompts_cursor, "projects": projects_cursor}
+    )
+    return serialization.respond(models.UserReadWithPosts, content)
+
+
+@router.patch('/users/{user_id}', status_code=status.HTTP_202_ACCEPTED)
+async def update_user(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    user_id: int,
+    user: models.UserUpdate,
+):
+    db_user = await session.get(models.User, user_id)
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"User with id {user_id} not found")
+
+    user_data = user.dict(exclude_unset=True)
+    for key, value in user_data.items():
+        if key == 'password':  # Hash the password if it's being updated
+            value = await run_in_threadpool(Hash.bcrypt, value)
+        setattr(db_user, key, value)
+
+    await session.commit()
+    await session.refresh(db_user)
+    return db_user
+
+@router.delete('/users/{user_id}', status_code=status.HTTP_202_ACCEPTED)
+async def delete_user(
+    *,
+    session: AsyncSession = Depends(database.get_async_session),
+    user_id: int
+):
+    user = await session.get(models.User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail=f"User with id {user_id} not found")
+    # Hidden from now on; the rows are removed by database.deletion_worker.
+    await session.run_sync(deletion.mark_deleted, user)
+    await session.commit()
+    database.deletion_worker.wake.set()
+    return {"ok": True}
+
+
+
+###############################################################################
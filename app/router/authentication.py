@@ -25,7 +25,57 @@ def login(request: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(
 
     # generate jwt token and return
     access_token = accesstoken.create_access_token(data={"sub": user.email})
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token, _ = accesstoken.create_refresh_token(db, user.id)
+    db.commit()
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
+@router.post('/token/refresh', response_model=models.Token)
+def refresh_access_token(request: models.TokenRefresh, db: Session = Depends(database.get_db)):
+    invalid_token_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    row = db.query(models.RefreshToken, models.User.email).join(
+        models.User, models.User.id == models.RefreshToken.user_id
+    ).filter(
+        models.RefreshToken.token_hash == accesstoken.hash_refresh_token(request.refresh_token)
+    ).first()
+    if row is None:
+        raise invalid_token_exception
+    db_token, email = row
 
+    if db_token.expires_at <= datetime.utcnow():
+        raise invalid_token_exception
 
+    # Revoke only if still live, in one statement: of two concurrent refreshes
+    # with the same token exactly one rotates it, the other counts as reuse.
+    rotated = db.query(models.RefreshToken).filter(
+        models.RefreshToken.id == db_token.id,
+        models.RefreshToken.revoked_at == None,
+    ).update({"revoked_at": datetime.utcnow()}, synchronize_session=False)
+    if not rotated:
+        # A rotated or revoked token was presented again: assume it leaked and
+        # kill every token descended from the same login.
+        accesstoken.revoke_refresh_token_family(db, db_token.family_id)
+        db.commit()
+        raise invalid_token_exception
+
+    refresh_token, new_token = accesstoken.create_refresh_token(db, db_token.user_id, db_token.family_id)
+    db.query(models.RefreshToken).filter(models.RefreshToken.id == db_token.id).update(
+        {"replaced_by_id": new_token.id}, synchronize_session=False
+    )
+    db.commit()
+
+    access_token = accesstoken.create_access_token(data={"sub": email})
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post('/token/revoke')
+def revoke_refresh_token(request: models.TokenRefresh, db: Session = Depends(database.get_db)):
+    db_token = db.query(models.RefreshToken).filter(
+        models.RefreshToken.token_hash == accesstoken.hash_refresh_token(request.refresh_token)
+    ).first()
+    if db_token is not None:
+        accesstoken.revoke_refresh_token_family(db, db_token.family_id)
+        db.commit()
+    return {'detail': "Refresh token revoked"}
@@ -1,34 +1,171 @@
-import json
-from pathlib import Path
-from fastapi import APIRouter, HTTPException
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from datetime import date, datetime, time
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+import orjson
+import conditional
+import currency_rates
+import models
 
 router = APIRouter()
 
-def load_currency_data():
+def current_snapshot():
     """
-    Load currency data from the JSON file
-    Returns the currency data as a dictionary
+    The in-memory currency data, reloaded when currency.json changes
     """
     try:
-        current_dir = Path(__file__).parent
-        json_path = current_dir / 'currency.json'
-        with open(json_path, 'r') as file:
-            return json.load(file)
-    except FileNotFoundError:
+        return currency_rates.rates.current()
+    except currency_rates.SnapshotError as e:
         raise HTTPException(
             status_code=500,
-            detail="Currency data file not found"
-        )
-    except json.JSONDecodeError:
-        raise HTTPException(
-            status_code=500,
-            detail="Error parsing currency data file"
+            detail=str(e)
         )
 
+def codes(value: str):
+    return [code.strip().upper() for code in value.split(",") if code.strip()]
+
+def numpy_response(content: dict):
+    return Response(orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY), media_type="application/json")
+
 @router.get("/currencyapi/latest")
-async def get_latest_rates():
+async def get_latest_rates(request: Request):
     """
     Get the latest currency exchange rates
     Returns a dictionary with meta information and currency rates
     """
-    return load_currency_data()
\ No newline at end of file
+    snapshot = current_snapshot()
+    if conditional.is_not_modified(request, snapshot.etag, snapshot.last_updated_at):
+        not_modified = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+        conditional.set_headers(not_modified, snapshot.etag, snapshot.last_updated_at)
+        return not_modified
+    response = Response(snapshot.body, media_type="application/json")
+    conditional.set_headers(response, snapshot.etag, snapshot.last_updated_at)
+    return response
+
+###############################################################################
+## Conversion
+
+@router.get("/currencyapi/convert", response_model=models.CurrencyConversion)
+async def convert(
+    base: str = Query(..., description="Currency code to convert from, e.g. EUR"),
+    target: str = Query(..., description="Currency code to convert to, e.g. GBP"),
+    amount: float = 1,
+):
+    """
+    Convert one amount between two currencies
+    """
+    snapshot = current_snapshot()
+    base, target = base.strip().upper(), target.strip().upper()
+    try:
+        rates, results = snapshot.convert([base], [target], [amount])
+    except currency_rates.UnknownCurrency as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return numpy_response({
+        "base": base, "target": target, "amount": amount,
+        "rate": rates[0], "result": results[0],
+        "last_updated_at": snapshot.meta["last_updated_at"],
+    })
+
+@router.post("/currencyapi/convert/batch", response_model=models.CurrencyBatchResult)
+async def convert_batch(batch: models.CurrencyBatch):
+    """
+    Convert many amounts at once. base, target and amount are columns of the
+    same length; a column with a single value applies to every item
+    """
+    size = max(len(batch.base), len(batch.target), len(batch.amount))
+    mismatched = [name for name in ("base", "target", "amount") if len(getattr(batch, name)) not in (1, size)]
+    if mismatched or size == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"base, target and amount must have {size or 'at least one'} item(s) or exactly 1",
+        )
+    if size > currency_rates.CURRENCY_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {currency_rates.CURRENCY_BATCH_MAX} conversions per request",
+        )
+    snapshot = current_snapshot()
+    try:
+        rates, results = snapshot.convert(
+            [code.upper() for code in batch.base], [code.upper() for code in batch.target], batch.amount
+        )
+    except currency_rates.UnknownCurrency as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if rates.shape[0] < size:
+        rates = rates.repeat(size)
+    return numpy_response({"rates": rates, "results": results, "last_updated_at": snapshot.meta["last_updated_at"]})
+
+@router.get("/currencyapi/cross", response_model=models.CurrencyCrossRates)
+async def cross_rates(
+    bases: str = Query(default="USD", description="Comma separated currency codes, e.g. USD,EUR"),
+    targets: str | None = Query(default=None, description="Comma separated currency codes; all when not given"),
+):
+    """
+    Cross-rate table: rates[i][j] is the price of one bases[i] in targets[j]
+    """
+    snapshot = current_snapshot()
+    bases = codes(bases)
+    targets = codes(targets) if targets else list(snapshot.codes)
+    try:
+        table = snapshot.table(bases, targets)
+    except currency_rates.UnknownCurrency as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return numpy_response({
+        "bases": bases, "targets": targets, "rates": table,
+        "last_updated_at": snapshot.meta["last_updated_at"],
+    })
+
+###############################################################################
+## History
+#
+# currency_history (and numpy with it) is not imported with the app: the
+# history recorder's thread loads it with the first snapshot (see
+# currency_rates._record_history), or the first history request does.
+
+def history_code(code: str):
+    import currency_history
+    code = code.strip().upper()
+    if not code.isalnum() or not currency_history.store.years(code):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No history for currency {code}")
+    return code
+
+@router.get("/currencyapi/history/{code}", response_model=models.CurrencyHistoryRate)
+async def rate_at(code: str, on: date = Query(..., alias="date", description="e.g. 2025-02-20")):
+    """
+    The rate against USD in effect on a date: the last one recorded by the end of that day
+    """
+    import currency_history
+    code = history_code(code)
+    found = currency_history.store.rate_at(code, datetime.combine(on, time.max))
+    if found is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No rate for {code} on or before {on}")
+    recorded_at, rate = found
+    return numpy_response({"code": code, "date": on.isoformat(), "rate": rate, "recorded_at": recorded_at})
+
+@router.get("/currencyapi/history/{code}/range", response_model=models.CurrencyHistoryRange)
+async def rate_range(
+    code: str,
+    start: date,
+    end: date,
+    interval: str = Query(default="daily", description="raw, daily or weekly"),
+):
+    """
+    Rates against USD from start to end (inclusive). daily and weekly give the
+    last rate of each day or week (weeks start on Monday)
+    """
+    import currency_history
+    code = history_code(code)
+    if interval not in currency_history.INTERVALS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown interval {interval}; choose from {', '.join(currency_history.INTERVALS)}",
+        )
+    if end < start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"end {end} is before start {start}")
+    times, rates = currency_history.store.range(
+        code, datetime.combine(start, time.min), datetime.combine(end, time.max), interval
+    )
+    return numpy_response({
+        "code": code, "interval": interval,
+        "timestamps": times.astype("datetime64[s]"), "rates": rates,
+    })
@@ -0,0 +1,40 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi import APIRouter, Depends, status, HTTPException, Query
+from fastapi.responses import StreamingResponse
+import database, models
+from sqlmodel import Session
+import oauth2
+import export
+
+router = APIRouter(
+    tags = ['Export']
+)
+
+###############################################################################
+## Export
+
+@router.get('/export', response_class=StreamingResponse)
+def export_content(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    types: str = Query(default="post,prompt,project", description="Comma separated: post, prompt, project"),
+    gzip: bool = Query(default=False, description="Gzip the stream"),
+):
+    requested = [t.strip() for t in types.split(",") if t.strip()]
+    unknown = [t for t in requested if t not in export.EXPORTABLE]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown export types {', '.join(unknown)}")
+
+    # The session stays open until the response has been sent.
+    chunks = export.ndjson(session, current_user.id, requested)
+    filename = "export.ndjson"
+    media_type = "application/x-ndjson"
+    if gzip:
+        chunks = export.gzipped(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        chunks, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,58 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi import APIRouter, Depends
+import database, dbpool, models
+import compression
+import currency_rates
+import currency_refresh
+import oauth2
+
+router = APIRouter(
+    tags = ['Metrics']
+)
+
+###############################################################################
+## Metrics (admin only)
+
+@router.get('/metrics/pool')
+def read_pool_metrics(
+    *,
+    current_user: models.User = Depends(oauth2.get_current_admin),
+):
+    """
+    Connection pool state per engine: pool size, checked out and overflow
+    connections, and checkout wait times over the recent window.
+    """
+    return dbpool.pool_status()
+
+@router.get('/metrics/replicas')
+def read_replica_health(
+    *,
+    current_user: models.User = Depends(oauth2.get_current_admin),
+):
+    """Health of each read replica as seen by the request router."""
+    return {**database.replica_set.status(), **database.async_replica_set.status()}
+
+@router.get('/metrics/compression')
+def read_compression_metrics(
+    *,
+    current_user: models.User = Depends(oauth2.get_current_admin),
+):
+    """
+    Responses compressed per encoding, bytes before and after, and the share
+    of a core compression used over the recent window against its budget.
+    """
+    return compression.status()
+
+@router.get('/metrics/currency')
+def read_currency_metrics(
+    *,
+    current_user: models.User = Depends(oauth2.get_current_admin),
+):
+    """Currency data in service and the state of the background refresher."""
+    snapshot = currency_rates.rates.snapshot
+    return {
+        "last_updated_at": snapshot.meta["last_updated_at"] if snapshot else None,
+        "currencies": len(snapshot.rates) if snapshot else 0,
+        "refresher": currency_refresh.refresher.status() if currency_refresh.refresher else None,
+    }
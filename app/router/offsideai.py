@@ -6,7 +6,6 @@ import database, models
 # from sqlalchemy.orm import Session
 from sqlmodel import Field, Relationship, Session, SQLModel, create_engine, select
 import oauth2
-import openai
 import base64
 import re
 
@@ -16,6 +15,11 @@ router = APIRouter(
     tags = ['offsidei']
 )
 
+def openai_client():
+    # openai takes about 0.3s to import, so it is loaded on first use rather than at startup.
+    import openai
+    return openai.OpenAI()
+
 ###############################################################################
 ## OpenAI
 
@@ -26,7 +30,7 @@ def dojsonfunctioncalling(
     current_user: models.User = Depends(oauth2.get_current_user),
     query: str = Query(..., description="The content to send to the OpenAI model")
 ):
-    client = openai.OpenAI()
+    client = openai_client()
     response = client.chat.completions.create(
         model="gpt-4-1106-preview",
         messages = [
@@ -51,7 +55,7 @@ def dofunctioncalling(
     current_user: models.User = Depends(oauth2.get_current_user),
     query: str = Query(..., description="The content to send to the OffsideAI model")
 ):
-    client = openai.OpenAI()
+    client = openai_client()
     response = client.chat.completions.create(
         model="gpt-4-1106-preview",
         messages = [
@@ -77,7 +81,7 @@ async def dovisionmagic(
     image: UploadFile = File(..., description="Image file to be processed")
     
 ):
-    client = openai.OpenAI()
+    client = openai_client()
     
     # Read the image file and convert it to BASE64
     image_content = await image.read()
@@ -117,7 +121,7 @@ async def dourlvisionmagic(
     imageurl: str = Query(..., description="The url of the file")
     
 ):
-    client = openai.OpenAI()
+    client = openai_client()
     
     # Read the image file and convert it to BASE64
     query: str = "What's in this image?"
@@ -157,7 +161,7 @@ async def dodocumentmagic(
     imageurl: str = Query(..., description="The url of the file")
     
 ):
-    client = openai.OpenAI()
+    client = openai_client()
     
     # Read the image file and convert it to BASE64
     query: str = "Can you take the contents of this image and explain all the details and also interpret and summarize the information and suggest steps?"
@@ -196,7 +200,7 @@ async def dovisioncountermagic(
     imageurl: str = Query(..., description="The url of the file")
     
 ):
-    client = openai.OpenAI()
+    client = openai_client()
     
     # Read the image file and convert it to BASE64
     query: str = "Can you take the contents of this image and count the number of items in the image? Just return the number and the item name"
@@ -235,7 +239,7 @@ async def dovisionhashtagsmagic(
     imageurl: str = Query(..., description="The url of the file")
     
 ):
-    client = openai.OpenAI()
+    client = openai_client()
     
     # Read the image file and convert it to BASE64
     query: str = "Can you take the contents of this image and generate a list of 15 relevant hashtags. Focus on capturing the key themes and elements present in the image. Ensure the hashtags are suitable for use on social media platforms like Instagram and Twitter, emphasizing salient items in the image. Present the hashtags in a clear, space-seperated list, with no numbering. "
@@ -278,7 +282,7 @@ async def doassistantmagic(
     # imageurl: str = Query(..., description="The url of the file")
     
 ):
-    client = openai.OpenAI()
+    client = openai_client()
     assistant = client.beta.assistants.create(
         name = "Bestie"
     )
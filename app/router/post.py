@@ -1,11 +1,18 @@
 import os, sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from typing import List
-from fastapi import APIRouter, Depends, status, HTTPException, Response, Query
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Query, Body
 import database, models
 # from sqlalchemy.orm import Session
 from sqlmodel import Field, Relationship, Session, SQLModel, create_engine, select
 import oauth2
+import bulk
+import pagination
+import serialization
+import relations
+import fieldsets
+import formats
+import conditional
 
 router = APIRouter(
     tags = ['Posts']
@@ -28,20 +35,71 @@ def create_post(
     session.refresh(db_post)
     return post
 
-@router.get('/posts', response_model=List[models.PostRead])
+@router.get('/posts/bulk', response_model=models.PostBulkRead)
+def read_posts_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    ids: str = Query(..., description="Comma separated ids, e.g. 1,2,3"),
+):
+    return serialization.respond(models.PostBulkRead, bulk.read_many(session, models.Post, bulk.parse_ids(ids)))
+
+@router.post('/posts/bulk', response_model=models.PostBulkResult)
+def create_posts_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    items: List[dict] = Body(...)
+):
+    return bulk.create(session, models.Post, models.PostCreate, items)
+
+@router.patch('/posts/bulk', response_model=models.PostBulkResult)
+def update_posts_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    items: List[dict] = Body(...)
+):
+    return bulk.update_many(session, models.Post, models.PostUpdate, items)
+
+@router.delete('/posts/bulk', response_model=models.BulkDeleteResult)
+def delete_posts_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    request: models.BulkDelete
+):
+    return bulk.delete_many(session, models.Post, request.ids)
+
+@router.get('/posts', response_model=List[models.PostReadPartial], response_model_exclude_unset=True)
 def read_posts(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = Query(default=100, lte=100),
+    cursor: str | None = None,
+    fields: str | None = Query(default=None, description="Comma separated columns to return, e.g. id,title"),
 ):
     # posts = session.exec(select(models.Post).offset(offset).limit(limit)).all()
     if current_user is None:
         raise HTTPException(status_code=401, detail="User not authenticated")
 
-    posts = session.query(models.Post).filter(models.Post.author_id == current_user.id).offset(offset).limit(limit).all()
-    return posts
+    owned = models.Post.author_id == current_user.id
+    media_type = formats.negotiate(request, response)
+    versions = conditional.list_versions(session, models.Post, owned, cursor, offset, limit)
+    not_modified = conditional.check(request, response, versions, collection=True)
+    if not_modified:
+        return not_modified
+
+    columns = fieldsets.columns(models.Post, fields, models.PostReadPartial, every=bool(media_type))
+    query = session.query(*(columns or [models.Post])).filter(owned)
+    posts = pagination.keyset(query, models.Post.id, cursor).offset(offset).limit(limit + 1).all()
+    if media_type:
+        return formats.respond(media_type, columns, pagination.page(response, posts, limit), models.PostReadPartial, response)
+    return serialization.respond(List[models.PostReadPartial], pagination.page(response, posts, limit), response, exclude_unset=True)
     # posts = session.exec(session.query(models.Post).filter(models.Post.author_id == current_user.id)).all()
     # return posts
 
@@ -50,9 +108,19 @@ def read_post(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
-    post_id: int
+    request: Request,
+    response: Response,
+    post_id: int,
+    include: str = Query(default="author", description="author, or empty for none"),
 ):
-    post = session.get(models.Post, post_id)
+    include = relations.parse_include(include, ["author"])
+    versions = conditional.entity_versions(session, models.Post, post_id, include)
+    if versions:
+        not_modified = conditional.check(request, response, versions)
+        if not_modified:
+            return not_modified
+
+    post = relations.with_author(session, models.Post, post_id, include)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Post with id {post_id} is not available")
     return post
@@ -1,11 +1,14 @@
 import os, sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from typing import List
-from fastapi import APIRouter, Depends, status, HTTPException, Response, Query
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Query
 import database, models
 # from sqlalchemy.orm import Session
 from sqlmodel import Field, Relationship, Session, SQLModel, create_engine, select
 import oauth2
+import pagination
+import relations
+import conditional
 
 router = APIRouter(
     tags = ['Professions']
@@ -27,28 +30,48 @@ def create_profession(
     session.refresh(db_profession)
     return profession
 
-@router.get('/professions', response_model=List[models.ProfessionRead])
+@router.get('/professions', response_model=List[models.ProfessionReadWithUser])
 def read_professions(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = Query(default=100, lte=100),
+    cursor: str | None = None,
+    users_limit: int = Query(default=20, lte=100, description="Maximum users per profession"),
 ):
-    professions = session.exec(select(models.Profession).offset(offset).limit(limit)).all()
-    return professions
+    versions = conditional.profession_list_versions(session, cursor, offset, limit, users_limit)
+    not_modified = conditional.check(request, response, versions, collection=True)
+    if not_modified:
+        return not_modified
+
+    statement = pagination.keyset(select(models.Profession), models.Profession.id, cursor)
+    professions = pagination.page(response, session.exec(statement.offset(offset).limit(limit + 1)).all(), limit)
+    # Capped like the detail route; the rest via /professions/{id}?users_cursor=
+    return relations.professions_with_users(session, professions, users_limit)
 
 @router.get('/professions/{profession_id}', response_model=models.ProfessionReadWithUser)
 def read_profession(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
-    profession_id: int
+    request: Request,
+    response: Response,
+    profession_id: int,
+    include: str = Query(default="users", description="users, or empty for none"),
+    limit: int = Query(default=20, lte=100, description="Maximum users returned"),
+    users_cursor: str | None = None,
 ):
-    profession = session.get(models.Profession, profession_id)
-    if not profession:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Profession with id {profession_id} is not available")
-    return profession
+    include = relations.parse_include(include, ["users"])
+    versions = conditional.profession_versions(session, profession_id, include, limit, users_cursor)
+    if versions:
+        not_modified = conditional.check(request, response, versions, collection="users" in include)
+        if not_modified:
+            return not_modified
+
+    return relations.profession_with_users(session, profession_id, include, limit, users_cursor)
 
 @router.patch('/professions/{profession_id}', response_model=models.ProfessionRead)
 def update_profession(
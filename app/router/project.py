@@ -1,88 +1,156 @@
 import os, sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from typing import List
-from fastapi import APIRouter, Depends, status, HTTPException, Response, Query
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Query, Body
 import database, models
 # from sqlalchemy.orm import Session
 from sqlmodel import Field, Relationship, Session, SQLModel, create_engine, select
 import oauth2
+import bulk
+import pagination
+import serialization
+import relations
+import fieldsets
+import formats
+import conditional
 
 router = APIRouter(
-    tags = ['Prompts']
+    tags = ['Projects']
 )
 
 ###############################################################################
-## Prompt
+## Project
 
-@router.post('/prompts/', response_model=models.PromptRead)
-def create_prompt(
+@router.post('/projects/', response_model=models.ProjectRead)
+def create_project(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
-    prompt: models.PromptCreate
+    project: models.ProjectCreate
 ):
-    db_prompt = models.Prompt.from_orm(prompt)
-    session.add(db_prompt)
+    db_project = models.Project.from_orm(project)
+    session.add(db_project)
     session.commit()
-    session.refresh(db_prompt)
-    return prompt
+    session.refresh(db_project)
+    return project
 
-@router.get('/prompts', response_model=List[models.PromptRead])
-def read_prompts(
+@router.get('/projects/bulk', response_model=models.ProjectBulkRead)
+def read_projects_bulk(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
+    ids: str = Query(..., description="Comma separated ids, e.g. 1,2,3"),
+):
+    return serialization.respond(models.ProjectBulkRead, bulk.read_many(session, models.Project, bulk.parse_ids(ids)))
+
+@router.post('/projects/bulk', response_model=models.ProjectBulkResult)
+def create_projects_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    items: List[dict] = Body(...)
+):
+    return bulk.create(session, models.Project, models.ProjectCreate, items)
+
+@router.patch('/projects/bulk', response_model=models.ProjectBulkResult)
+def update_projects_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    items: List[dict] = Body(...)
+):
+    return bulk.update_many(session, models.Project, models.ProjectUpdate, items)
+
+@router.delete('/projects/bulk', response_model=models.BulkDeleteResult)
+def delete_projects_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    request: models.BulkDelete
+):
+    return bulk.delete_many(session, models.Project, request.ids)
+
+@router.get('/projects', response_model=List[models.ProjectReadPartial], response_model_exclude_unset=True)
+def read_projects(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = Query(default=100, lte=100),
+    cursor: str | None = None,
+    fields: str | None = Query(default=None, description="Comma separated columns to return, e.g. id,title"),
 ):
-    # prompts = session.exec(select(models.Prompt).offset(offset).limit(limit)).all()
-    prompts = session.query(models.Prompt).filter(models.Prompt.author_id == current_user.id).offset(offset).limit(limit).all()
-    return prompts
+    # projects = session.exec(select(models.Project).offset(offset).limit(limit)).all()
+    owned = models.Project.author_id == current_user.id
+    media_type = formats.negotiate(request, response)
+    versions = conditional.list_versions(session, models.Project, owned, cursor, offset, limit)
+    not_modified = conditional.check(request, response, versions, collection=True)
+    if not_modified:
+        return not_modified
 
-@router.get('/prompts/{prompt_id}', response_model=models.PromptReadWithUser)
-def read_prompt(
+    columns = fieldsets.columns(models.Project, fields, models.ProjectReadPartial, every=bool(media_type))
+    query = session.query(*(columns or [models.Project])).filter(owned)
+    projects = pagination.keyset(query, models.Project.id, cursor).offset(offset).limit(limit + 1).all()
+    if media_type:
+        return formats.respond(media_type, columns, pagination.page(response, projects, limit), models.ProjectReadPartial, response)
+    return serialization.respond(List[models.ProjectReadPartial], pagination.page(response, projects, limit), response, exclude_unset=True)
+
+@router.get('/projects/{project_id}', response_model=models.ProjectReadWithUser)
+def read_project(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
-    prompt_id: int
+    request: Request,
+    response: Response,
+    project_id: int,
+    include: str = Query(default="author", description="author, or empty for none"),
 ):
-    prompt = session.get(models.Prompt, prompt_id)
-    if not prompt:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Prompt with id {prompt_id} is not available")
-    return prompt
+    include = relations.parse_include(include, ["author"])
+    versions = conditional.entity_versions(session, models.Project, project_id, include)
+    if versions:
+        not_modified = conditional.check(request, response, versions)
+        if not_modified:
+            return not_modified
+
+    project = relations.with_author(session, models.Project, project_id, include)
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Project with id {project_id} is not available")
+    return project
 
-@router.patch('/prompts/{prompt_id}', response_model=models.PromptRead)
-def update_prompt(
+@router.patch('/projects/{project_id}', response_model=models.ProjectRead)
+def update_project(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
-    prompt_id: int,
-    prompt: models.PromptUpdate
+    project_id: int,
+    project: models.ProjectUpdate
 ):
-    db_prompt = session.get(models.Prompt, prompt_id)
-    if not db_prompt:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Prompt with id {prompt_id} not found")
-    prompt_data = prompt.dict(exclude_unset=True)
-    for key, value in prompt_data.items():
-        setattr(db_prompt, key, value)
-    session.add(db_prompt)
+    db_project = session.get(models.Project, project_id)
+    if not db_project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Project with id {project_id} not found")
+    project_data = project.dict(exclude_unset=True)
+    for key, value in project_data.items():
+        setattr(db_project, key, value)
+    session.add(db_project)
     session.commit()
-    session.refresh(db_prompt)
-    return db_prompt
+    session.refresh(db_project)
+    return db_project
 
-@router.delete('/prompts/{prompt_id}')
-def delete_prompt(
+@router.delete('/projects/{project_id}')
+def delete_project(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
-    prompt_id: int,
+    project_id: int,
 ):
-    prompt = session.get(models.Prompt, prompt_id)
-    if not prompt:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Prompt with id {prompt_id} not found")
-    session.delete(prompt)
+    project = session.get(models.Project, project_id)
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Project with id {project_id} not found")
+    session.delete(project)
     session.commit()
-    return {'detail': f"Prompt with id {prompt_id} was deleted"}
+    return {'detail': f"Project with id {project_id} was deleted"}
 
 
 ###############################################################################
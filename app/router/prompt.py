@@ -1,11 +1,18 @@
 import os, sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from typing import List
-from fastapi import APIRouter, Depends, status, HTTPException, Response, Query
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Query, Body
 import database, models
 # from sqlalchemy.orm import Session
 from sqlmodel import Field, Relationship, Session, SQLModel, create_engine, select
 import oauth2
+import bulk
+import pagination
+import serialization
+import relations
+import fieldsets
+import formats
+import conditional
 
 router = APIRouter(
     tags = ['Prompts']
@@ -27,26 +34,87 @@ def create_prompt(
     session.refresh(db_prompt)
     return prompt
 
-@router.get('/prompts', response_model=List[models.PromptRead])
+@router.get('/prompts/bulk', response_model=models.PromptBulkRead)
+def read_prompts_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    ids: str = Query(..., description="Comma separated ids, e.g. 1,2,3"),
+):
+    return serialization.respond(models.PromptBulkRead, bulk.read_many(session, models.Prompt, bulk.parse_ids(ids)))
+
+@router.post('/prompts/bulk', response_model=models.PromptBulkResult)
+def create_prompts_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    items: List[dict] = Body(...)
+):
+    return bulk.create(session, models.Prompt, models.PromptCreate, items)
+
+@router.patch('/prompts/bulk', response_model=models.PromptBulkResult)
+def update_prompts_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    items: List[dict] = Body(...)
+):
+    return bulk.update_many(session, models.Prompt, models.PromptUpdate, items)
+
+@router.delete('/prompts/bulk', response_model=models.BulkDeleteResult)
+def delete_prompts_bulk(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    request: models.BulkDelete
+):
+    return bulk.delete_many(session, models.Prompt, request.ids)
+
+@router.get('/prompts', response_model=List[models.PromptReadPartial], response_model_exclude_unset=True)
 def read_prompts(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = Query(default=100, lte=100),
+    cursor: str | None = None,
+    fields: str | None = Query(default=None, description="Comma separated columns to return, e.g. id,title"),
 ):
     # prompts = session.exec(select(models.Prompt).offset(offset).limit(limit)).all()
-    prompts = session.query(models.Prompt).filter(models.Prompt.author_id == current_user.id).offset(offset).limit(limit).all()
-    return prompts
+    owned = models.Prompt.author_id == current_user.id
+    media_type = formats.negotiate(request, response)
+    versions = conditional.list_versions(session, models.Prompt, owned, cursor, offset, limit)
+    not_modified = conditional.check(request, response, versions, collection=True)
+    if not_modified:
+        return not_modified
+
+    columns = fieldsets.columns(models.Prompt, fields, models.PromptReadPartial, every=bool(media_type))
+    query = session.query(*(columns or [models.Prompt])).filter(owned)
+    prompts = pagination.keyset(query, models.Prompt.id, cursor).offset(offset).limit(limit + 1).all()
+    if media_type:
+        return formats.respond(media_type, columns, pagination.page(response, prompts, limit), models.PromptReadPartial, response)
+    return serialization.respond(List[models.PromptReadPartial], pagination.page(response, prompts, limit), response, exclude_unset=True)
 
 @router.get('/prompts/{prompt_id}', response_model=models.PromptReadWithUser)
 def read_prompt(
     *,
     session: Session = Depends(database.get_session),
     current_user: models.User = Depends(oauth2.get_current_user),
-    prompt_id: int
+    request: Request,
+    response: Response,
+    prompt_id: int,
+    include: str = Query(default="author", description="author, or empty for none"),
 ):
-    prompt = session.get(models.Prompt, prompt_id)
+    include = relations.parse_include(include, ["author"])
+    versions = conditional.entity_versions(session, models.Prompt, prompt_id, include)
+    if versions:
+        not_modified = conditional.check(request, response, versions)
+        if not_modified:
+            return not_modified
+
+    prompt = relations.with_author(session, models.Prompt, prompt_id, include)
     if not prompt:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Prompt with id {prompt_id} is not available")
     return prompt
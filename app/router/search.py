@@ -0,0 +1,30 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import List
+from fastapi import APIRouter, Depends, status, HTTPException, Query
+import database, models
+from sqlmodel import Session
+import oauth2
+import search
+
+router = APIRouter(
+    tags = ['Search']
+)
+
+###############################################################################
+## Search
+
+@router.get('/search', response_model=List[models.SearchResult])
+def search_content(
+    *,
+    session: Session = Depends(database.get_session),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    q: str = Query(..., min_length=1, description="Words to search for in titles and bodies"),
+    types: str = Query(default="post,prompt,project", description="Comma separated: post, prompt, project"),
+    limit: int = Query(default=20, lte=100),
+):
+    requested = [t.strip() for t in types.split(",") if t.strip()]
+    unknown = [t for t in requested if t not in search.SEARCHABLE]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown search types {', '.join(unknown)}")
+    return search.search(session, current_user.id, q, requested, limit)
@@ -1,12 +1,19 @@
 import os, sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from typing import List
-from fastapi import APIRouter, Depends, status, HTTPException, Response, Query
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Query
 from sqlmodel import Field, Relationship, Session, SQLModel, create_engine, select
 
 import database, models
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from hashing import Hash
+import pagination
+import serialization
+import relations
+import fieldsets
+import formats
+import deletion
 
 router = APIRouter(
     tags = ['Users']
@@ -33,7 +40,11 @@ def create_user(
     )
     
     session.add(db_user)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"User with email {user.email} already exists")
     session.refresh(db_user)
     return db_user
 
@@ -41,22 +52,35 @@ def create_user(
 def read_users(
     *,
     session: Session = Depends(database.get_session),
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = Query(default=100, lte=100),
+    cursor: str | None = None,
 ):
-    users = session.exec(select(models.User).offset(offset).limit(limit)).all()
-    return users
+    media_type = formats.negotiate(request, response)
+    if media_type:
+        columns = fieldsets.columns(models.User, None, models.UserRead, every=True)
+        statement = pagination.keyset(select(*columns), models.User.id, cursor)
+        rows = session.execute(statement.offset(offset).limit(limit + 1)).all()
+        return formats.respond(media_type, columns, pagination.page(response, rows, limit), models.UserRead, response)
+    statement = pagination.keyset(select(models.User), models.User.id, cursor)
+    users = session.exec(statement.offset(offset).limit(limit + 1)).all()
+    return serialization.respond(List[models.UserRead], pagination.page(response, users, limit), response)
 
 @router.get('/users/{user_id}', response_model=models.UserReadWithPosts)
 def read_user(
     *,
     user_id:int,
-    session: Session = Depends(database.get_session)
+    session: Session = Depends(database.get_session),
+    include: str = Query(default="posts,prompts", description="Comma separated: posts, prompts, projects"),
+    limit: int = Query(default=20, lte=100, description="Maximum items per included collection"),
+    posts_cursor: str | None = None,
+    prompts_cursor: str | None = None,
+    projects_cursor: str | None = None,
 ):
-    user = session.get(models.User, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail=f"User with id {user_id} not found")
-    return user
+    include = relations.parse_include(include, relations.USER_COLLECTIONS)
+    return serialization.respond(models.UserReadWithPosts, relations.user_with_collections(session, user_id, include, limit, {"posts": posts_cursor, "prompts": prompts_cursor, "projects": projects_cursor}))
 
 
 @router.patch('/users/{user_id}', status_code=status.HTTP_202_ACCEPTED)
@@ -80,7 +104,7 @@ def update_user(
     session.refresh(db_user)
     return db_user
 
-@router.delete('/users/{user_id}')
+@router.delete('/users/{user_id}', status_code=status.HTTP_202_ACCEPTED)
 def delete_user(
     *,
     session: Session = Depends(database.get_session),
@@ -89,8 +113,10 @@ def delete_user(
     user = session.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail=f"User with id {user_id} not found")
-    session.delete(user)
+    # Hidden from now on; the rows are removed by database.deletion_worker.
+    deletion.mark_deleted(session, user)
     session.commit()
+    database.deletion_worker.wake.set()
     return {"ok": True}
 
 
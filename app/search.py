@@ -0,0 +1,138 @@
+import re
+from sqlalchemy import DDL, event, inspect, select, text
+import models
+
+###############################################################################
+## Full-text search
+#
+# PostgreSQL: a tsvector column plus a GIN index per table.
+# SQLite: an FTS5 table per table, holding its own copy of title and body.
+# The app writes the search document from the plaintext title and body: the
+# stored body may be zstd-compressed (see textcompression.py), which the
+# database cannot read. ORM inserts and updates are indexed by the mapper
+# events below; bulk.py and bulk_import.py call index_documents and reindex
+# themselves. Deletes need nothing on PostgreSQL (the vector is in the row)
+# and a trigger on SQLite. Migration 2e8b4d7f9c63 installs the same objects on
+# existing databases and indexes their rows; the DDL below covers create_all().
+
+SEARCHABLE = {
+    "post": models.Post,
+    "prompt": models.Prompt,
+    "project": models.Project,
+}
+
+TS_CONFIG = "english"
+REINDEX_BATCH = 1000
+
+
+def postgres_ddl(table: str):
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)",
+    ]
+
+
+def sqlite_ddl(table: str):
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(title, body)",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = old.id; END",
+    ]
+
+
+for _table, _model in SEARCHABLE.items():
+    for _statement in postgres_ddl(_table):
+        event.listen(_model.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+    for _statement in sqlite_ddl(_table):
+        event.listen(_model.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+def index_documents(connection, table: str, documents):
+    """Write the search documents of (id, title, body) rows, body in plaintext."""
+    params = [{"id": id, "title": title or "", "body": body or ""} for id, title, body in documents]
+    if not params:
+        return
+    if connection.dialect.name == "postgresql":
+        connection.execute(
+            text(f"UPDATE {table} SET search_vector = to_tsvector('{TS_CONFIG}', :title || ' ' || :body) WHERE id = :id"),
+            params,
+        )
+    else:
+        connection.execute(text(f"DELETE FROM {table}_fts WHERE rowid = :id"), params)
+        connection.execute(text(f"INSERT INTO {table}_fts(rowid, title, body) VALUES (:id, :title, :body)"), params)
+
+
+def reindex(connection, table: str, ids=None, after_id: int = 0):
+    """
+    Rebuild the search documents of the rows with the given ids, or of every
+    row with an id above after_id, reading bodies through CompressedText.
+    Returns the number of rows indexed.
+    """
+    model = SEARCHABLE[table]
+    statement = select(model.id, model.title, model.body).order_by(model.id).limit(REINDEX_BATCH)
+    if ids is not None:
+        statement = statement.where(model.id.in_(list(ids)))
+    count = 0
+    while True:
+        rows = connection.execute(statement.where(model.id > after_id)).all()
+        index_documents(connection, table, rows)
+        count += len(rows)
+        if len(rows) < REINDEX_BATCH:
+            return count
+        after_id = rows[-1].id
+
+
+def _index_inserted(mapper, connection, target):
+    index_documents(connection, mapper.local_table.name, [(target.id, target.title, target.body)])
+
+
+def _index_updated(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if attrs.title.history.has_changes() or attrs.body.history.has_changes():
+        index_documents(connection, mapper.local_table.name, [(target.id, target.title, target.body)])
+
+
+for _model in SEARCHABLE.values():
+    event.listen(_model, "after_insert", _index_inserted)
+    event.listen(_model, "after_update", _index_updated)
+
+
+def fts5_query(q: str):
+    """Turn free text into an FTS5 query: every word must match, as a literal."""
+    words = re.findall(r"\w+", q)
+    return " ".join(f'"{w}"' for w in words)
+
+
+def search(session, user_id: int, q: str, types, limit: int):
+    """
+    Best matches for q among the user's rows of the given types, ordered by
+    relevance (higher rank is better).
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        q = fts5_query(q)
+    if not q:
+        return []
+
+    results = []
+    for table in types:
+        if dialect == "postgresql":
+            statement = text(
+                f"SELECT t.id, t.title, ts_rank_cd(t.search_vector, query) AS rank "
+                f"FROM {table} t, websearch_to_tsquery('{TS_CONFIG}', :q) query "
+                f"WHERE t.search_vector @@ query AND t.author_id = :user_id "
+                f"ORDER BY rank DESC LIMIT :limit"
+            )
+        else:
+            statement = text(
+                f"SELECT t.id, t.title, -bm25({table}_fts) AS rank "
+                f"FROM {table}_fts JOIN {table} t ON t.id = {table}_fts.rowid "
+                f"WHERE {table}_fts MATCH :q AND t.author_id = :user_id "
+                f"ORDER BY rank DESC LIMIT :limit"
+            )
+        for row in session.execute(statement, {"q": q, "user_id": user_id, "limit": limit}):
+            results.append({"type": table, "id": row.id, "title": row.title, "rank": row.rank})
+
+    results.sort(key=lambda r: r["rank"], reverse=True)
+    return results[:limit]
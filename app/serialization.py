@@ -0,0 +1,97 @@
+import typing
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+import orjson
+
+###############################################################################
+## Fast JSON responses
+#
+# The app's default response class is ORJSONResponse. On top of that, hot
+# routes return respond(schema, content): content is already trusted (ORM
+# objects, result rows or dicts the route built itself), so instead of
+# FastAPI's validate-then-jsonable_encoder pass we only pick the schema's
+# fields off each object and hand plain dicts and lists to orjson, which
+# encodes datetimes natively. The route keeps response_model for the OpenAPI
+# schema; FastAPI does not re-serialize a returned Response.
+
+_MISSING = object()
+_encoders = {}
+
+
+def _get(obj, name):
+    if isinstance(obj, dict):
+        return obj.get(name, _MISSING)
+    return getattr(obj, name, _MISSING)
+
+
+def _identity(value):
+    return value
+
+
+def encoder(schema):
+    """Function turning a trusted value of type schema into orjson-ready data."""
+    if schema in _encoders:
+        return _encoders[schema]
+
+    origin = typing.get_origin(schema)
+    if origin in (list, typing.List):
+        item = encoder(typing.get_args(schema)[0])
+        encode = lambda values, exclude_unset=False: [item(v, exclude_unset) for v in values]
+    elif origin is typing.Union:
+        options = [a for a in typing.get_args(schema) if a is not type(None)]
+        inner = encoder(options[0]) if len(options) == 1 else _plain
+        encode = lambda value, exclude_unset=False: None if value is None else inner(value, exclude_unset)
+    elif isinstance(schema, type) and issubclass(schema, BaseModel):
+        fields = [(field, name, encoder(field.outer_type_) if _is_nested(field) else None)
+                  for name, field in schema.__fields__.items()]
+        # Result rows from column projections (and dicts) only carry the
+        # selected fields; exclude_unset leaves the rest out.
+        def encode(obj, exclude_unset=False):
+            data = {}
+            for field, name, nested in fields:
+                value = _get(obj, name)
+                if value is _MISSING:
+                    if exclude_unset:
+                        continue
+                    value = field.get_default()
+                data[field.alias] = nested(value, exclude_unset) if nested and value is not None else value
+            return data
+    else:
+        encode = _plain
+    _encoders[schema] = encode
+    return encode
+
+
+def _is_nested(field):
+    for t in (field.outer_type_, field.type_):
+        if typing.get_origin(t) in (list, typing.List, typing.Union):
+            return True
+        if isinstance(t, type) and issubclass(t, BaseModel):
+            return True
+    return False
+
+
+def _plain(value, exclude_unset=False):
+    if isinstance(value, BaseModel):
+        return value.dict(exclude_unset=exclude_unset)
+    return value
+
+
+def dump(schema, content, exclude_unset: bool = False):
+    return orjson.dumps(encoder(schema)(content, exclude_unset))
+
+
+def respond(schema, content, response: Response = None, exclude_unset: bool = False, status_code: int = 200):
+    """
+    JSON response for trusted content shaped like schema. Headers and status
+    set on the route's injected response (cursors, ETags) are carried over.
+    """
+    fast = Response(dump(schema, content, exclude_unset), status_code=status_code, media_type=ORJSONResponse.media_type)
+    if response is not None:
+        if response.status_code:
+            fast.status_code = response.status_code
+        fast.raw_headers.extend(
+            (key, value) for key, value in response.raw_headers if key not in (b"content-length", b"content-type")
+        )
+    return fast
@@ -0,0 +1,202 @@
+"""
+Precompressed static files for the /api mount.
+
+    cd app
+    python static_assets.py [--directory static]
+
+writes a .gz and (with the Brotli package installed) a .br copy next to every
+compressible file in the directory; files whose copies are newer than the
+source are skipped. Run it in the build where you can. Otherwise the server
+writes missing copies at startup, in a background thread of one worker per
+host (precompress_once). Until a copy exists, or when one cannot be read, the
+plain file is served; the mount is never compressed on the fly.
+"""
+import os, sys
+import argparse
+import fcntl
+import gzip
+import hashlib
+import logging
+import mimetypes
+import stat as stat_module
+import tempfile
+import time
+from email.utils import formatdate
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from compression import accepted_encodings
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_MAX_AGE = int(os.environ.get("STATIC_MAX_AGE", 86400))
+
+COMPRESSIBLE = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+MIN_SIZE = 1024
+# Preferred first when the client accepts both.
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+def compressible(path: str):
+    media_type, _ = mimetypes.guess_type(path)
+    return media_type is not None and media_type.startswith(COMPRESSIBLE)
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _write(path: str, data: bytes, mode: int):
+    # A unique temporary name, so concurrent builds never write the same file.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def precompress(directory: str = STATIC_DIR):
+    """Create missing or stale .gz/.br copies. Returns the paths written."""
+    brotli = _brotli()
+    written = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith(tuple(ENCODINGS.values())) or not compressible(path):
+                continue
+            stat = os.stat(path)
+            if stat.st_size < MIN_SIZE:
+                continue
+            data = None
+            for encoding, suffix in ENCODINGS.items():
+                target = path + suffix
+                if encoding == "br" and brotli is None:
+                    continue
+                if os.path.exists(target) and os.stat(target).st_mtime_ns >= stat.st_mtime_ns:
+                    continue
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                if encoding == "br":
+                    compressed = brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+                else:
+                    # mtime=0 keeps the output, and so the ETag, reproducible.
+                    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                _write(target, compressed, stat_module.S_IMODE(stat.st_mode))
+                written.append(target)
+    return written
+
+
+def precompress_once(directory: str = STATIC_DIR):
+    """
+    precompress() in the first process on the host to get the lock; the
+    others return at once. The lock lives in the temp directory, so the static
+    directory may be read-only (nothing is written then, and that is logged).
+    """
+    name = hashlib.sha256(os.path.abspath(directory).encode()).hexdigest()[:16]
+    try:
+        with open(os.path.join(tempfile.gettempdir(), f"static-precompress-{name}.lock"), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return []
+            written = precompress(directory)
+    except OSError as e:
+        logger.warning(f"Precompressing {directory} failed, serving plain files: {e!r}")
+        return []
+    if written:
+        logger.info(f"Precompressed {len(written)} static files")
+    return written
+
+
+###############################################################################
+## Serving
+
+_digests = {}
+
+
+def _digest(path: str, stat: os.stat_result):
+    """sha256 of a file's bytes, cached until its mtime or size changes."""
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _digests:
+        with open(path, "rb") as f:
+            _digests[key] = hashlib.sha256(f.read()).hexdigest()[:32]
+    return _digests[key]
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles serving the .br or .gz copy written by precompress() when the
+    client accepts it and the copy is current and readable, the plain file
+    otherwise. Every response has a strong
+    ETag (digest of the bytes sent) and Cache-Control; If-None-Match and
+    If-Modified-Since are answered with 304.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        media_type, _ = mimetypes.guess_type(str(full_path))
+        headers = {"Cache-Control": self.cache_control(media_type)}
+        path, stat = str(full_path), stat_result
+        digest = None
+        if compressible(path):
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding"))
+            for encoding, suffix in ENCODINGS.items():
+                if encoding not in accepted:
+                    continue
+                try:
+                    variant = os.stat(path + suffix)
+                    if variant.st_mtime_ns < stat_result.st_mtime_ns:
+                        continue
+                    digest = _digest(path + suffix, variant)
+                except OSError:
+                    continue
+                path, stat = path + suffix, variant
+                headers["Content-Encoding"] = encoding
+                break
+        headers["ETag"] = f'"{digest or _digest(path, stat)}"'
+        headers["Last-Modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+        response = FileResponse(
+            path, status_code=status_code, stat_result=stat, method=scope["method"],
+            media_type=media_type, headers=headers,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def cache_control(self, media_type: str | None):
+        # HTML has fixed URLs, so browsers revalidate it (a cheap 304) on every use.
+        if media_type == "text/html":
+            return "public, no-cache"
+        return f"public, max-age={STATIC_MAX_AGE}"
+
+    def is_not_modified(self, response_headers, request_headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in candidates or response_headers["etag"] in candidates
+        return super().is_not_modified(response_headers, request_headers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="static_assets.py")
+    parser.add_argument("--directory", default=STATIC_DIR)
+    args = parser.parse_args()
+    if _brotli() is None:
+        print("Brotli is not installed; writing .gz files only", file=sys.stderr)
+    started = time.perf_counter()
+    for path in precompress(args.directory):
+        print(f"{path}: {os.path.getsize(path):,} bytes")
+    print(f"Done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
@@ -0,0 +1,50 @@
+import os, sys
+import subprocess
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Detail routes embed the author by default, which joins User into the
+# queries that also carry the deleted-user criteria.
+DETAIL_ROUTES = """
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+import accesstoken, database, main, models
+
+database.create_db_and_tables()
+with Session(database.engine) as session:
+    live = models.User(name="live", email="live@example.com", password="x")
+    gone = models.User(name="gone", email="gone@example.com", password="x", deleted_at=datetime.utcnow())
+    session.add_all([live, gone])
+    session.commit()
+    ids = {}
+    for model in (models.Post, models.Prompt, models.Project):
+        row = model(title="title", body="body", author_id=live.id)
+        session.add(row)
+        session.commit()
+        ids[model.__tablename__] = row.id
+
+client = TestClient(main.app)
+headers = {"Authorization": "Bearer " + accesstoken.create_access_token(data={"sub": "live@example.com"})}
+for table, id in ids.items():
+    response = client.get(f"/{table}s/{id}", headers=headers)
+    assert response.status_code == 200, (table, response.status_code, response.text)
+    assert response.json()["author"]["name"] == "live", response.json()
+"""
+
+
+@pytest.mark.parametrize("database_async", ["false", "true"])
+def test_detail_routes_with_a_deleted_user(database_async):
+    # In its own interpreter: database reads its settings when imported.
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ, ENV="development", SQLITE_PATH=os.path.join(tmp, "test.db"),
+            SECRET_KEY="test-secret", ALGORITHM="HS256", DATABASE_ASYNC=database_async,
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", DETAIL_ROUTES], cwd=APP_DIR, env=env, capture_output=True, text=True,
+        )
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,13 @@
+import os, sys
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_hot_queries_use_an_index():
+    # In its own interpreter: check_query_plans points the database module at
+    # a throwaway database before importing it.
+    result = subprocess.run(
+        [sys.executable, "check_query_plans.py"], cwd=APP_DIR, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,46 @@
+import os, sys
+import json
+import statistics
+import subprocess
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(APP_DIR, "benchmarks"))
+
+from startup import LAZY, MEASURE_IMPORT, environment, first_request_time, import_time
+
+# As benchmarks/startup.py's default --import-budget and --first-request-budget.
+IMPORT_BUDGET = float(os.environ.get("STARTUP_IMPORT_BUDGET", 1.2))
+FIRST_REQUEST_BUDGET = float(os.environ.get("STARTUP_FIRST_REQUEST_BUDGET", 2.5))
+RUNS = 3
+
+
+def test_import_main_leaves_heavy_packages_unloaded():
+    # In its own interpreter, so modules imported by other tests do not count.
+    with tempfile.TemporaryDirectory() as tmp:
+        result = subprocess.run(
+            [sys.executable, "-c", MEASURE_IMPORT], cwd=APP_DIR, env=environment(tmp), capture_output=True, text=True,
+        )
+    assert result.returncode == 0, result.stdout + result.stderr
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])["loaded"]
+    assert loaded == [], f"imported by `import main`, should be lazy: {loaded} (of {LAZY})"
+
+
+def test_import_main_within_budget():
+    samples = []
+    for _ in range(RUNS):
+        with tempfile.TemporaryDirectory() as tmp:
+            samples.append(import_time(environment(tmp))["seconds"])
+    median = statistics.median(samples)
+    assert median <= IMPORT_BUDGET, f"import main took {median:.3f}s (median of {samples}), budget {IMPORT_BUDGET}s"
+
+
+def test_first_request_within_budget():
+    samples = []
+    for _ in range(RUNS):
+        with tempfile.TemporaryDirectory() as tmp:
+            samples.append(first_request_time(environment(tmp)))
+    median = statistics.median(samples)
+    assert median <= FIRST_REQUEST_BUDGET, (
+        f"first request took {median:.3f}s (median of {samples}), budget {FIRST_REQUEST_BUDGET}s"
+    )
@@ -0,0 +1,155 @@
+import base64
+import glob
+import os
+from sqlalchemy.types import TEXT, TypeDecorator
+
+###############################################################################
+## Compressed text columns
+#
+# Opt-in, per column: list "table.column" names in COMPRESSED_TEXT_COLUMNS
+# (e.g. "prompt.body,project.body,profession.description"). Enabled columns
+# store values of at least TEXT_COMPRESSION_MIN_BYTES as zstd frames, using the
+# newest trained dictionary in TEXT_COMPRESSION_DICT_DIR.
+#
+# The column stays TEXT, so turning this on needs no schema change and old
+# plain rows keep working. A stored value is one of:
+#
+#   "\x1fz" + base85(zstd frame)    compressed
+#   "\x1ft" + text                  plain text that itself starts with "\x1f"
+#   anything else                   plain text
+#
+# Reading always understands all three, so compression can be switched on or
+# off at any time and compress_text.py converts existing rows in the background.
+# Values are decoded when a row is loaded with the column selected, not on
+# attribute access: ?fields= projections and 304 responses never pay for it,
+# a full row always does. Search documents are written from the plaintext
+# (search.py), so the database never needs to read a compressed value.
+
+MARKER = "\x1f"
+COMPRESSED = MARKER + "z"
+ESCAPED = MARKER + "t"
+
+COMPRESSED_TEXT_COLUMNS = {
+    name.strip() for name in os.getenv("COMPRESSED_TEXT_COLUMNS", "").split(",") if name.strip()
+}
+TEXT_COMPRESSION_MIN_BYTES = int(os.getenv("TEXT_COMPRESSION_MIN_BYTES", 256))
+TEXT_COMPRESSION_LEVEL = int(os.getenv("TEXT_COMPRESSION_LEVEL", 9))
+TEXT_COMPRESSION_DICT_DIR = os.getenv(
+    "TEXT_COMPRESSION_DICT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "zstd_dicts")
+)
+
+_codec = None
+
+
+def enabled(name: str):
+    return name in COMPRESSED_TEXT_COLUMNS
+
+
+class Codec:
+    """
+    zstd compressor for the newest dictionary, decompressors for every known
+    dictionary. Frames record their dictionary id, so rows written with an
+    older dictionary stay readable after a new one is trained.
+    """
+
+    def __init__(self, dict_dir: str = TEXT_COMPRESSION_DICT_DIR, level: int = TEXT_COMPRESSION_LEVEL):
+        import zstandard
+
+        self.zstd = zstandard
+        self.dictionaries = {}
+        newest = None
+        for path in sorted(glob.glob(os.path.join(dict_dir, "*.zdict")), key=os.path.getmtime):
+            with open(path, "rb") as f:
+                dictionary = zstandard.ZstdCompressionDict(f.read())
+            self.dictionaries[dictionary.dict_id()] = dictionary
+            newest = dictionary
+        self.dict_id = newest.dict_id() if newest else 0
+        self.compressor = zstandard.ZstdCompressor(level=level, dict_data=newest)
+        self.decompressors = {0: zstandard.ZstdDecompressor()}
+        for dict_id, dictionary in self.dictionaries.items():
+            self.decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+
+    def compress(self, data: bytes):
+        return self.compressor.compress(data)
+
+    def decompress(self, frame: bytes):
+        dict_id = self.zstd.get_frame_parameters(frame).dict_id
+        decompressor = self.decompressors.get(dict_id)
+        if decompressor is None:
+            raise ValueError(f"Compressed value needs zstd dictionary {dict_id}, which is not in {TEXT_COMPRESSION_DICT_DIR}")
+        return decompressor.decompress(frame)
+
+
+def codec():
+    global _codec
+    if _codec is None:
+        _codec = Codec()
+    return _codec
+
+
+def reload():
+    """Pick up a newly trained dictionary."""
+    global _codec
+    _codec = None
+
+
+def encode(value: str, compress: bool = True):
+    """Stored form of value; compress=False stores it plain."""
+    if value is None:
+        return None
+    if compress:
+        data = value.encode("utf-8")
+        if len(data) >= TEXT_COMPRESSION_MIN_BYTES:
+            packed = COMPRESSED + base64.b85encode(codec().compress(data)).decode("ascii")
+            if len(packed) < len(value):
+                return packed
+    if value.startswith(MARKER):
+        return ESCAPED + value
+    return value
+
+
+def decode(stored: str):
+    if stored is None or not stored.startswith(MARKER):
+        return stored
+    if stored.startswith(COMPRESSED):
+        return codec().decompress(base64.b85decode(stored[len(COMPRESSED):])).decode("utf-8")
+    if stored.startswith(ESCAPED):
+        return stored[len(ESCAPED):]
+    return stored
+
+
+def is_compressed(stored: str):
+    return stored is not None and stored.startswith(COMPRESSED)
+
+
+def train_dictionary(samples, size: int = 112640, dict_dir: str = TEXT_COMPRESSION_DICT_DIR):
+    """Train a dictionary from sample texts and save it as the newest one."""
+    import zstandard
+
+    dictionary = zstandard.train_dictionary(size, [s.encode("utf-8") for s in samples])
+    os.makedirs(dict_dir, exist_ok=True)
+    path = os.path.join(dict_dir, f"{dictionary.dict_id()}.zdict")
+    with open(path, "wb") as f:
+        f.write(dictionary.as_bytes())
+    reload()
+    return path
+
+
+class CompressedText(TypeDecorator):
+    """
+    TEXT column whose values are compressed when name ("table.column") is
+    listed in COMPRESSED_TEXT_COLUMNS. Always decodes compressed values.
+    """
+
+    impl = TEXT
+    cache_ok = True
+
+    def __init__(self, name: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.name = name
+
+    def process_bind_param(self, value, dialect):
+        return encode(value, enabled(self.name))
+
+    def process_result_value(self, value, dialect):
+        return decode(value)